@@ -6,14 +6,29 @@ This script takes the existing HTML reports and converts them to code blocks
 that can be embedded in Squarespace pages.
 """
 
+import hashlib
 import os
+import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from bs4 import BeautifulSoup
 import argparse
 
+# Parsed report data is cached here, at the repository root whatever the
+# working directory, keyed by the source file's mtime and size
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'convert_to_squarespace'
+# Bump whenever extract_content_from_html changes what it returns, so cached
+# content from the old extractor is not reused
+EXTRACTOR_VERSION = 1
+
+# Matches whole <img> tags, including multi-MB base64 data: URIs
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+
 def extract_content_from_html(html_content):
     """Extract the main content from HTML, removing base64 images and restructuring for Squarespace."""
+    # Nothing below reads images; drop them before the parser has to scan the payloads
+    html_content = IMG_TAG_RE.sub('', html_content)
     soup = BeautifulSoup(html_content, 'html.parser')
     
     # Extract key information
@@ -75,7 +90,7 @@ def extract_content_from_html(html_content):
 def generate_squarespace_html(data, dept_code):
     """Generate Squarespace-compatible HTML code block."""
     
-    template = f"""<!-- Squarespace Code Block Version - {data['dept_name']} Budget Report -->
+    parts = [f"""<!-- Squarespace Code Block Version - {data['dept_name']} Budget Report -->
 <div class="budget-report-container">
     <style>
         .budget-report-container {{
@@ -235,28 +250,28 @@ def generate_squarespace_html(data, dept_code):
     <div class="header">
         <h1>{data['budget_title']}</h1>
         <h2>{data['dept_name']}</h2>
-    </div>"""
+    </div>"""]
 
     if data['description']:
-        template += f"""
+        parts.append(f"""
     
     <div class="dept-description">
         <h3>About {data['dept_name']}</h3>
         <p>{data['description']}</p>
-    </div>"""
+    </div>""")
 
     if data['cards_data']:
-        template += """
+        parts.append("""
     
-    <div class="summary-stats">"""
+    <div class="summary-stats">""")
         for card in data['cards_data']:
-            template += f"""
+            parts.append(f"""
         <div class="budget-card">
             <div class="budget-amount">{card['amount']}</div>
             <div class="budget-label">{card['label']}</div>
-        </div>"""
-        template += """
-    </div>"""
+        </div>""")
+        parts.append("""
+    </div>""")
 
     if data['table_rows']:
         # Find the main budget header
@@ -267,7 +282,7 @@ def generate_squarespace_html(data, dept_code):
                 break
         
         if main_header:
-            template += f"""
+            parts.append(f"""
     
     <table class="budget-table">
         <thead>
@@ -276,42 +291,78 @@ def generate_squarespace_html(data, dept_code):
                 <th class="amount">{main_header['amount']}</th>
             </tr>
         </thead>
-        <tbody>"""
+        <tbody>""")
             
             # Add non-total rows
             for row in data['table_rows']:
                 if row != main_header and not row['is_total']:
-                    template += f"""
+                    parts.append(f"""
             <tr>
                 <td>{row['label']}</td>
                 <td class="amount">{row['amount']}</td>
-            </tr>"""
+            </tr>""")
             
-            template += """
+            parts.append("""
         </tbody>
-    </table>"""
+    </table>""")
 
-    template += """
+    parts.append("""
     
     <div class="note-section">
         <p><strong>Note:</strong> Charts and detailed visualizations are available in the full PDF report.</p>
         <p style="font-size: 0.9em; color: #7f8c8d;">Generated from Hawaii State Budget FY 2026 Post-Veto Data</p>
     </div>
-</div>"""
+</div>""")
 
-    return template
+    return ''.join(parts)
 
-def convert_html_file(input_file, output_dir):
-    """Convert a single HTML file to Squarespace format."""
+def dept_code_from_path(file_path):
+    """Department code from a report filename, e.g. 'agr_budget_report.html' -> 'AGR'."""
+    return Path(file_path).stem.split('_', 1)[0].upper()
+
+def load_report_data(input_file, dept_code):
+    """
+    Return the extracted content for a report, reusing the cached copy when
+    the source file is unchanged since it was last parsed.
+    """
+    input_path = Path(input_file).resolve()
+    stat = input_path.stat()
+    key = (stat.st_mtime_ns, stat.st_size, EXTRACTOR_VERSION)
+    # The same department can be converted from several input directories;
+    # a hash of the resolved path keeps their entries apart
+    path_hash = hashlib.sha1(str(input_path).encode('utf-8')).hexdigest()[:12]
+    cache_file = CACHE_DIR / f"{dept_code.lower()}-{path_hash}.pkl"
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == key:
+            return data
+    except Exception:
+        # Missing, partial or incompatible cache: extract the report again
+        pass
+    
     with open(input_file, 'r', encoding='utf-8') as f:
         html_content = f.read()
+    data = extract_content_from_html(html_content)
     
-    # Extract department code from filename
-    filename = Path(input_file).stem
-    dept_code = filename.split('_')[0].upper()
+    # Write-then-rename so a concurrent or interrupted run never sees a partial file
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
     
-    # Extract content
-    data = extract_content_from_html(html_content)
+    return data
+
+def convert_html_file(input_file, output_dir, dept_code=None):
+    """Convert a single HTML file to Squarespace format."""
+    # Extract department code from filename unless the caller already has it
+    if dept_code is None:
+        dept_code = dept_code_from_path(input_file)
+    
+    # Extract content (skips parsing when the report hasn't changed)
+    data = load_report_data(input_file, dept_code)
     
     # Generate Squarespace HTML
     squarespace_html = generate_squarespace_html(data, dept_code)
@@ -323,39 +374,44 @@ def convert_html_file(input_file, output_dir):
     
     return output_file
 
-def create_navigation_index(output_dir, converted_files):
-    """Create a navigation index for all departments."""
-    
-    # Department name mapping
-    dept_names = {
-        'AGR': 'Department of Agriculture',
-        'AGS': 'Department of Accounting and General Services',
-        'ATG': 'Department of the Attorney General',
-        'BED': 'Department of Business, Economic Development and Tourism',
-        'BUF': 'Department of Budget and Finance',
-        'CCA': 'Department of Commerce and Consumer Affairs',
-        'CCH': 'City and County of Honolulu',
-        'COH': 'County of Hawaii',
-        'COK': 'County of Kauai',
-        'DEF': 'Department of Defense',
-        'EDN': 'Department of Education',
-        'GOV': 'Office of the Governor',
-        'HHL': 'Department of Hawaiian Home Lands',
-        'HMS': 'Department of Human Services',
-        'HRD': 'Department of Human Resources Development',
-        'HTH': 'Department of Health',
-        'LAW': 'Department of Law Enforcement',
-        'LBR': 'Department of Labor and Industrial Relations',
-        'LNR': 'Department of Land and Natural Resources',
-        'LTG': 'Office of the Lieutenant Governor',
-        'P': 'General Administration',
-        'PSD': 'Department of Corrections and Rehabilitation',
-        'TAX': 'Department of Taxation',
-        'TRN': 'Department of Transportation',
-        'UOH': 'University of Hawaii'
-    }
-    
-    index_html = """<!-- Squarespace Navigation Index for Budget Reports -->
+def _convert_one(args):
+    """Process-pool worker: convert one file, returning the output path or the error."""
+    input_file, output_dir, dept_code = args
+    try:
+        return convert_html_file(input_file, output_dir, dept_code), None
+    except Exception as e:
+        return None, e
+
+# Department name mapping for the navigation index
+DEPT_NAMES = {
+    'AGR': 'Department of Agriculture',
+    'AGS': 'Department of Accounting and General Services',
+    'ATG': 'Department of the Attorney General',
+    'BED': 'Department of Business, Economic Development and Tourism',
+    'BUF': 'Department of Budget and Finance',
+    'CCA': 'Department of Commerce and Consumer Affairs',
+    'CCH': 'City and County of Honolulu',
+    'COH': 'County of Hawaii',
+    'COK': 'County of Kauai',
+    'DEF': 'Department of Defense',
+    'EDN': 'Department of Education',
+    'GOV': 'Office of the Governor',
+    'HHL': 'Department of Hawaiian Home Lands',
+    'HMS': 'Department of Human Services',
+    'HRD': 'Department of Human Resources Development',
+    'HTH': 'Department of Health',
+    'LAW': 'Department of Law Enforcement',
+    'LBR': 'Department of Labor and Industrial Relations',
+    'LNR': 'Department of Land and Natural Resources',
+    'LTG': 'Office of the Lieutenant Governor',
+    'P': 'General Administration',
+    'PSD': 'Department of Corrections and Rehabilitation',
+    'TAX': 'Department of Taxation',
+    'TRN': 'Department of Transportation',
+    'UOH': 'University of Hawaii'
+}
+
+INDEX_HEADER = """<!-- Squarespace Navigation Index for Budget Reports -->
 <div class="budget-index-container">
     <style>
         .budget-index-container {
@@ -447,21 +503,14 @@ def create_navigation_index(output_dir, converted_files):
     </div>
     
     <div class="dept-grid">"""
-    
-    # Sort departments by code
-    sorted_files = sorted(converted_files, key=lambda x: Path(x).stem.split('_')[0])
-    
-    for file_path in sorted_files:
-        dept_code = Path(file_path).stem.split('_')[0].upper()
-        dept_name = dept_names.get(dept_code, f"Department {dept_code}")
-        
-        index_html += f"""
+
+DEPT_CARD_TEMPLATE = """
         <div class="dept-card">
-            <div class="dept-code">{dept_code}</div>
-            <div class="dept-name">{dept_name}</div>
+            <div class="dept-code">{code}</div>
+            <div class="dept-name">{name}</div>
         </div>"""
-    
-    index_html += """
+
+INDEX_FOOTER = """
     </div>
     
     <div style="text-align: center; margin-top: 40px; padding: 20px; background-color: #f8f9fa; border-radius: 8px;">
@@ -469,11 +518,25 @@ def create_navigation_index(output_dir, converted_files):
         <p style="color: #7f8c8d; margin: 5px 0 0 0; font-size: 0.9em;">Data source: HB300 CD1 - State of Hawaii Operating and Capital Budget</p>
     </div>
 </div>"""
+
+def create_navigation_index(output_dir, converted):
+    """
+    Create a navigation index for all departments.
+    
+    ``converted`` is a list of ``(dept_code, output_file)`` pairs.
+    """
+    
+    # Sort departments by code, then render every card in one join
+    dept_codes = sorted(code for code, _ in converted)
+    cards = (
+        DEPT_CARD_TEMPLATE.format(code=code, name=DEPT_NAMES.get(code, f"Department {code}"))
+        for code in dept_codes
+    )
     
     # Write index file
     index_file = Path(output_dir) / "index_squarespace.html"
     with open(index_file, 'w', encoding='utf-8') as f:
-        f.write(index_html)
+        f.write(''.join([INDEX_HEADER, *cards, INDEX_FOOTER]))
     
     return index_file
 
@@ -501,14 +564,18 @@ def main():
     
     converted_files = []
     
-    # Convert each file
-    for html_file in html_files:
-        try:
-            output_file = convert_html_file(html_file, output_dir)
-            converted_files.append(output_file)
-            print(f"Converted: {html_file.name} -> {output_file.name}")
-        except Exception as e:
-            print(f"Error converting {html_file.name}: {e}")
+    # Convert each file; files are independent, so fan them out across processes
+    dept_codes = [dept_code_from_path(html_file) for html_file in html_files]
+    jobs = [(str(html_file), str(output_dir), code) for html_file, code in zip(html_files, dept_codes)]
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_convert_one, jobs))
+    
+    for html_file, dept_code, (output_file, error) in zip(html_files, dept_codes, results):
+        if error is not None:
+            print(f"Error converting {html_file.name}: {error}")
+            continue
+        converted_files.append((dept_code, output_file))
+        print(f"Converted: {html_file.name} -> {output_file.name}")
     
     # Create navigation index
     if converted_files:
@@ -16,29 +16,78 @@ Path(OUTPUT_DIR).mkdir(exist_ok=True)
 def load_data():
     """Load and preprocess the budget data."""
     print(f"Loading data from {CSV_PATH}...")
-    df = pd.read_csv(CSV_PATH)
+    # pyarrow's multithreaded reader is much faster when available. Every
+    # column is kept: the saved review files carry the full rows
+    try:
+        df = pd.read_csv(CSV_PATH, engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv(CSV_PATH)
     
-    # Ensure amount is numeric
-    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+    # Ensure amount is numeric (only needs coercing if the parser saw stray text)
+    if not pd.api.types.is_numeric_dtype(df['amount']):
+        df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
     
     # Filter for capital improvements only
     capital = df[df['section'] == 'Capital Improvement'].copy()
     
+    # Low-cardinality keys as categoricals: smaller and faster to group on
+    for col in ['fund_type', 'department_code', 'department_name', 'program_id']:
+        capital[col] = capital[col].astype('category')
+    
     return df, capital
 
+def _column_width(values, header):
+    """Width that fits the header and every value of a text column."""
+    return max([len(header), *(len(str(v)) for v in values)])
+
+def print_allocations(df):
+    """Print allocation rows as fixed-width columns, one row at a time."""
+    id_width = _column_width(df['program_id'], 'program_id')
+    name_width = _column_width(df['program_name'], 'program_name')
+    print(f"{'program_id':<{id_width}} {'program_name':<{name_width}} {'amount':>15} {'fund_type':<4}")
+    for row in df.itertuples(index=False):
+        print(f"{row.program_id:<{id_width}} {str(row.program_name):<{name_width}} "
+              f"{row.amount:>15,.0f} {row.fund_type:<4}")
+
+def _sort_codes(col):
+    """Integer codes for a column that preserve its sort order (NaN -> -1)."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy()
+    return pd.factorize(col, sort=True)[0]
+
+def find_duplicates(df, keys):
+    """
+    Return all rows sharing the same values in ``keys``, ordered by ``keys``.
+    
+    Sorts once with ``np.lexsort`` and compares neighbours instead of hashing
+    every row, so the result comes out already in report order.
+    """
+    if len(df) < 2:
+        return df.iloc[:0]
+    
+    codes = [_sort_codes(df[k]) for k in keys]
+    # lexsort treats the last key as primary
+    order = np.lexsort(codes[::-1])
+    
+    same = np.ones(len(order) - 1, dtype=bool)
+    for c in codes:
+        sorted_c = c[order]
+        same &= sorted_c[1:] == sorted_c[:-1]
+    
+    is_dup = np.r_[False, same] | np.r_[same, False]
+    return df.iloc[order[is_dup]]
+
 def check_duplicate_allocations(df):
     """Check for duplicate allocations that might be causing double-counting."""
     print("\nChecking for potential duplicate allocations...")
     
-    # Group by key fields that should be unique
-    duplicates = df[df.duplicated(
-        ['program_id', 'fiscal_year', 'amount', 'fund_type'], 
-        keep=False
-    )].sort_values(['program_id', 'amount'])
+    # Key fields that should be unique; program_id and amount lead so the
+    # rows come back in review order
+    duplicates = find_duplicates(df, ['program_id', 'amount', 'fiscal_year', 'fund_type'])
     
     if not duplicates.empty:
         print(f"Found {len(duplicates)} potential duplicate allocations:")
-        print(duplicates[['program_id', 'program_name', 'amount', 'fund_type']].to_string())
+        print_allocations(duplicates)
         
         # Save to CSV for review
         dup_file = Path(OUTPUT_DIR) / 'potential_duplicates.csv'
@@ -55,7 +104,7 @@ def check_large_allocations(df, threshold=100_000_000):
     
     if not large.empty:
         print(f"Found {len(large)} large allocations:")
-        print(large[['program_id', 'program_name', 'amount', 'fund_type']].to_string())
+        print_allocations(large)
         
         # Save to CSV for review
         large_file = Path(OUTPUT_DIR) / 'large_allocations.csv'
@@ -64,36 +113,46 @@ def check_large_allocations(df, threshold=100_000_000):
     else:
         print(f"No allocations over ${threshold/1e6:,.0f}M found.")
 
-def check_fund_type_distribution(df):
-    """Analyze distribution of fund types in capital budget."""
-    print("\nAnalyzing fund type distribution...")
-    
-    fund_summary = df.groupby('fund_type').agg(
+def summarize_by_fund_type(df):
+    """Aggregate allocation count, total and mean amount per fund type."""
+    return df.groupby('fund_type', observed=True).agg(
         count=('amount', 'count'),
         total_amount=('amount', 'sum'),
         avg_amount=('amount', 'mean')
     ).sort_values('total_amount', ascending=False)
+
+def summarize_by_department(df):
+    """Aggregate program count, allocation count and total amount per department."""
+    return df.groupby(['department_code', 'department_name'], observed=True).agg(
+        program_count=('program_id', 'nunique'),
+        allocation_count=('amount', 'count'),
+        total_amount=('amount', 'sum'),
+    ).sort_values('total_amount', ascending=False)
+
+def check_fund_type_distribution(fund_summary):
+    """Analyze distribution of fund types in capital budget."""
+    print("\nAnalyzing fund type distribution...")
     
     print("\nFund Type Summary:")
-    print(fund_summary.to_string())
+    print(f"{'fund_type':<10} {'count':>8} {'total_amount':>18} {'avg_amount':>15}")
+    for fund_type, count, total, avg in fund_summary.itertuples(name=None):
+        print(f"{fund_type:<10} {count:>8,} {total:>18,.0f} {avg:>15,.0f}")
     
     # Save to CSV
     fund_file = Path(OUTPUT_DIR) / 'fund_type_analysis.csv'
     fund_summary.to_csv(fund_file)
     print(f"Saved fund type analysis to {fund_file}")
 
-def check_department_totals(df):
+def check_department_totals(dept_summary):
     """Analyze capital budget by department."""
     print("\nAnalyzing capital budget by department...")
     
-    dept_summary = df.groupby(['department_code', 'department_name']).agg(
-        program_count=('program_id', 'nunique'),
-        allocation_count=('amount', 'count'),
-        total_amount=('amount', 'sum'),
-    ).sort_values('total_amount', ascending=False)
-    
     print("\nDepartment Summary (Top 10 by Total Amount):")
-    print(dept_summary.head(10).to_string())
+    top = dept_summary.head(10)
+    name_width = _column_width(top.index.get_level_values('department_name'), 'department_name')
+    print(f"{'code':<5} {'department_name':<{name_width}} {'programs':>8} {'allocations':>11} {'total_amount':>18}")
+    for (code, name), programs, allocations, total in top.itertuples(name=None):
+        print(f"{code:<5} {str(name):<{name_width}} {programs:>8,} {allocations:>11,} {total:>18,.0f}")
     
     # Save to CSV
     dept_file = Path(OUTPUT_DIR) / 'department_analysis.csv'
@@ -107,11 +166,15 @@ def main():
     print(f"Total capital improvement allocations: {len(capital_df):,}")
     print(f"Total capital budget: ${capital_df['amount'].sum()/1e9:,.2f}B")
     
+    # Aggregate once up front; the reporters only format the results
+    fund_summary = summarize_by_fund_type(capital_df)
+    dept_summary = summarize_by_department(capital_df)
+    
     # Run diagnostics
     check_duplicate_allocations(capital_df)
     check_large_allocations(capital_df)
-    check_fund_type_distribution(capital_df)
-    check_department_totals(capital_df)
+    check_fund_type_distribution(fund_summary)
+    check_department_totals(dept_summary)
     
     print("\nAnalysis complete. Check the 'analysis' directory for detailed reports.")
 
@@ -9,25 +9,29 @@ import pandas as pd
 pd.set_option('display.notebook_repr_html', False)
 pd.set_option('display.max_columns', None)
 
-import matplotlib
-# Set the backend to 'Agg' to prevent display issues
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 from pathlib import Path
 import base64
-import json  # For embedding chart data as JSON
+import bisect
+import json
 import io
-from io import BytesIO
 import argparse
+import functools
+import gzip
+import html
+import math
+import pickle
+import re
+from string import Template
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import logging
 import traceback
 import sys
 
 # Ensure matplotlib doesn't try to use display
 os.environ['MPLBACKEND'] = 'Agg'
-plt.ioff()  # Turn off interactive mode
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,429 +40,111 @@ logger = logging.getLogger(__name__)
 # Default department description to use when none is found
 DEFAULT_DEPT_DESCRIPTION = "No description available for this department."
 
-class DepartmentalBudgetAnalyzer:
-    """Generate departmental budget reports with HTML tables and charts."""
-    
-    def __init__(self, data_file: str, output_dir: str = "data/output/departmental_reports",
-                 descriptions_file: str = "data/processed/department_descriptions.json"):
-        """
-        Initialize the analyzer.
-        
-        Args:
-            data_file: Path to the budget allocations CSV file
-            output_dir: Directory to save HTML reports
-            descriptions_file: Path to the JSON file containing department descriptions
-        """
-        self.data_file = data_file
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Load data
-        self.df = pd.read_csv(data_file)
-        logger.info(f"Loaded {len(self.df)} budget allocations")
-        
-        # Load department descriptions
-        self.descriptions = self._load_descriptions(descriptions_file)
-        
-        # Fund type mappings to match the reference
-        self.fund_mappings = {
-            'A': 'General Funds',
-            'B': 'Special Funds', 
-            'N': 'Federal Funds',
-            'P': 'Federal Funds',  # Other Federal Funds -> Federal Funds
-            'W': 'Other Funds',    # Revolving Funds -> Other Funds
-            'T': 'Other Funds',    # Trust Funds -> Other Funds
-            'U': 'Other Funds',    # Interdepartmental Transfers -> Other Funds
-            'R': 'Other Funds',    # Reimbursements -> Other Funds
-            'S': 'Other Funds'     # Other Special Funds -> Other Funds
-        }
-        
-        # Colors for charts (matching official style)
-        self.colors = {
-            'General Funds': '#1f77b4',      # Blue
-            'Special Funds': '#2ca02c',      # Green  
-            'Federal Funds': '#2c3e50',      # Dark blue/gray
-            'Other Funds': '#17a2b8'         # Cyan
-        }
-        
-        # Department code to full name mapping
-        self.department_names = {
-            'AGR': 'AGRICULTURE AND BIOSECURITY',
-            'AGS': 'ACCOUNTING AND GENERAL SERVICES',
-            'ATG': 'ATTORNEY GENERAL',
-            'BED': 'BUSINESS, ECONOMIC DEVELOPMENT, AND TOURISM',
-            'BUF': 'BUDGET AND FINANCE',
-            'CCA': 'COMMERCE AND CONSUMER AFFAIRS',
-            'CCH': 'CITY AND COUNTY OF HONOLULU',
-            'COH': 'COUNTY OF HAWAII',
-            'COK': 'COUNTY OF KAUAI',
-            'COM': 'COUNTY OF MAUI',
-            'DEF': 'DEFENSE',
-            'EDN': 'EDUCATION',
-            'GOV': 'GOVERNOR',
-            'HHL': 'HAWAIIAN HOME LANDS',
-            'HMS': 'HUMAN SERVICES',
-            'HRD': 'HUMAN RESOURCES DEVELOPMENT',
-            'HTH': 'HEALTH',
-            'LAW': 'LAW ENFORCEMENT',
-            'LBR': 'LABOR AND INDUSTRIAL RELATIONS',
-            'LNR': 'LAND AND NATURAL RESOURCES',
-            'LTG': 'LIEUTENANT GOVERNOR',
-            'P': 'LEGISLATURE',
-            'PSD': 'CORRECTIONS AND REHABILITATION',
-            'SUB': 'SUBSIDIES',
-            'TAX': 'TAXATION',
-            'TRN': 'TRANSPORTATION',
-            'UOH': 'UNIVERSITY OF HAWAII'
-        }
-        
-        # Department code to display name mapping (for the descriptions)
-        self.display_names = {
-            'AGR': 'Department of Agriculture and Biosecurity',
-            'AGS': 'Department of Accounting and General Services',
-            'ATG': 'Department of the Attorney General',
-            'BED': 'Department of Business, Economic Development, and Tourism',
-            'BUF': 'Department of Budget and Finance',
-            'CCA': 'Department of Commerce and Consumer Affairs',
-            'CCH': 'City and County of Honolulu',
-            'COH': 'County of Hawaii',
-            'COK': 'County of Kauai',
-            'COM': 'County of Maui',
-            'DEF': 'Department of Defense',
-            'EDN': 'Department of Education',
-            'GOV': 'Office of the Governor',
-            'HHL': 'Department of Hawaiian Home Lands',
-            'HMS': 'Department of Human Services',
-            'HRD': 'Department of Human Resources Development',
-            'HTH': 'Department of Health',
-            'LAW': 'Department of Law Enforcement',
-            'LBR': 'Department of Labor and Industrial Relations',
-            'LNR': 'Department of Land and Natural Resources',
-            'LTG': 'Office of the Lieutenant Governor',
-            'P': 'State Legislature',
-            'PSD': 'Department of Corrections and Rehabilitation',
-            'SUB': 'Subsidies',
-            'TAX': 'Department of Taxation',
-            'TRN': 'Department of Transportation',
-            'UOH': 'University of Hawaii'
-        }
-    
-    def get_department_summary(self, dept_code: str) -> dict:
-        """
-        Get comprehensive budget summary for a department.
-        
-        Args:
-            dept_code: Department code (e.g., 'AGR')
-            
-        Returns:
-            Dictionary with department budget breakdown
-        """
-        dept_data = self.df[self.df['department_code'] == dept_code].copy()
-        
-        if dept_data.empty:
-            logger.warning(f"No data found for department {dept_code}")
-            return None
-        
-        # Use full department name from mapping
-        dept_name = self.department_names.get(dept_code, dept_code)
-        
-        # Map fund types
-        dept_data['fund_category_mapped'] = dept_data['fund_type'].map(self.fund_mappings)
-        
-        # Calculate operating budget by fund type
-        operating_data = dept_data[dept_data['section'] == 'Operating']
-        operating_by_fund = operating_data.groupby('fund_category_mapped')['amount'].sum()
-        
-        # Calculate CIP projects (Capital Improvement section)
-        cip_data = dept_data[dept_data['section'] == 'Capital Improvement']
-        cip_total = cip_data['amount'].sum()
-        
-        # Calculate other appropriations (non-operating, non-CIP)
-        other_data = dept_data[(dept_data['section'] != 'Operating') & (dept_data['section'] != 'Capital Improvement')]
-        other_total = other_data['amount'].sum()
-        
-        # Total operating budget (excluding one-time appropriations)
-        total_operating = operating_by_fund.sum()
-        
-        # Handle one-time appropriations separately
-        one_time_data = dept_data[dept_data['section'] == 'One-Time']
-        one_time_by_fund = pd.Series(dtype=float)
-        one_time_total = 0
-        
-        if not one_time_data.empty:
-            one_time_by_fund = one_time_data.groupby('fund_category_mapped')['amount'].sum()
-            one_time_total = one_time_by_fund.sum()
-        
-        # Overall total includes operating + one-time + other appropriations
-        total_budget = total_operating + one_time_total + other_total
-        
-        summary = {
-            'department_code': dept_code,
-            'department_name': dept_name,
-            'total_budget': total_budget,
-            'operating_budget': {
-                'General Funds': operating_by_fund.get('General Funds', 0),
-                'Special Funds': operating_by_fund.get('Special Funds', 0),
-                'Federal Funds': operating_by_fund.get('Federal Funds', 0),
-                'Other Funds': operating_by_fund.get('Other Funds', 0),
-                'total': total_operating
-            },
-            'one_time_appropriations': {
-                'General Funds': one_time_by_fund.get('General Funds', 0),
-                'Special Funds': one_time_by_fund.get('Special Funds', 0),
-                'Federal Funds': one_time_by_fund.get('Federal Funds', 0),
-                'Other Funds': one_time_by_fund.get('Other Funds', 0),
-                'total': one_time_total
-            },
-            'other_appropriations': other_total,
-            'cip_projects': cip_total,
-            'raw_data': dept_data
-        }
-        
-        return summary
-    
-    def create_department_chart(self, summary: dict) -> str:
-        """
-        Create a horizontal stacked bar chart for department budget with non-overlapping labels.
-        
-        Args:
-            summary: Department summary dictionary
-            
-        Returns:
-            Base64 encoded image string
-        """
-        try:
-            plt.switch_backend('Agg')
-            plt.rcParams.update({'font.size': 14, 'axes.titlesize': 16, 'axes.labelsize': 14})
-            
-            fig, ax = plt.subplots(figsize=(16, 8), dpi=150)
-            
-            fund_types = ['General Funds', 'Special Funds', 'Federal Funds', 'Other Funds']
-            amounts = [summary['operating_budget'][ft] / 1_000_000 for ft in fund_types]
-            colors = [self.colors[ft] for ft in fund_types]
-            
-            filtered_data = sorted([(amt, color, label) for amt, color, label in 
-                                  zip(amounts, colors, fund_types) if amt > 0],
-                                 key=lambda x: x[0], reverse=True)
-            
-            if not filtered_data:
-                ax.text(0.5, 0.5, 'No Operating Budget Data', 
-                        ha='center', va='center', fontsize=16)
-                ax.axis('off')
-            else:
-                amounts, colors, fund_types = zip(*filtered_data)
-                total_amount = sum(amounts)
-                left = 0
-                
-                bars = ax.barh(0, amounts[0], left=left, color=colors[0], 
-                              label=fund_types[0], height=0.6, alpha=0.9)
-                bars_list = [bars[0]]
-                label_positions = []
-                text_objects = []
-                
-                for i, (amount, color, label) in enumerate(zip(amounts, colors, fund_types)):
-                    segment_center = left + amount/2
-                    # Format as billions if ≥ 1000 million, otherwise as millions
-                    if amount >= 1000:
-                        text = f'${amount/1000:,.1f}B'
-                    else:
-                        text = f'${amount:,.0f}M'
-                    
-                    if amount > total_amount * 0.1:  
-                        brightness = sum(matplotlib.colors.to_rgb(color)[:3])/3
-                        text_color = 'white' if brightness < 0.6 else 'black'
-                        
-                        txt = ax.text(segment_center, 0, text, 
-                                     ha='center', va='center',
-                                     color=text_color,
-                                     fontweight='bold', 
-                                     fontsize=14,
-                                     bbox=dict(facecolor='none', 
-                                               edgecolor='none',
-                                               alpha=0.7,
-                                               boxstyle='round,pad=0.2'))
-                        label_positions.append((left, left + amount))
-                        text_objects.append(txt)
-                    else:
-                        label_positions.append(None)
-                        text_objects.append(None)
-                    
-                    if i < len(amounts) - 1:
-                        left += amount
-                        bar = ax.barh(0, amounts[i+1], left=left, 
-                                    color=colors[i+1], 
-                                    label=fund_types[i+1], 
-                                    height=0.6, 
-                                    alpha=0.9)
-                        bars_list.append(bar[0])
-                
-                for i, (amount, color, label) in enumerate(zip(amounts, colors, fund_types)):
-                    if label_positions[i] is None or amount <= total_amount * 0.1:
-                        segment_start = sum(amounts[:i])
-                        segment_end = segment_start + amount
-                        
-                        if text_objects[i] is not None:
-                            text_objects[i].remove()
-                        
-                        y_offset = 0
-                        for offset in [0.7, -0.7, 1.4, -1.4, 2.1, -2.1]:
-                            overlap = False
-                            for j, pos in enumerate(label_positions):
-                                if pos is None or j == i:
-                                    continue
-                                start, end = pos
-                                if ((segment_start <= end and segment_end >= start) or
-                                    (segment_start >= start and segment_start <= end) or
-                                    (segment_end >= start and segment_end <= end)):
-                                    overlap = True
-                                    break
-                            if not overlap:
-                                y_offset = offset
-                                break
-                        
-                        # Format as billions if ≥ 1000 million, otherwise as millions
-                        if amount >= 1000:
-                            amount_text = f'${amount/1000:,.1f}B'
-                        else:
-                            amount_text = f'${amount:,.0f}M'
-                        
-                        txt = ax.text(segment_start + amount/2, y_offset, amount_text,
-                                     ha='center', va='center',
-                                     bbox=dict(facecolor='white', 
-                                               alpha=0.9, 
-                                               edgecolor='#666666',
-                                               boxstyle='round,pad=0.6'),
-                                     fontsize=12,
-                                     fontweight='bold')
-                        
-                        if y_offset != 0:
-                            ax.plot([segment_start + amount/2, segment_start + amount/2], 
-                                    [0 if y_offset > 0 else -0.3, y_offset * 0.9], 
-                                    'k-', lw=1.5, alpha=0.6)
-                
-                ax.set_xlim(0, total_amount * 1.2)  
-                ax.set_ylim(-3, 3)  
-                
-                ax.xaxis.grid(True, linestyle='--', alpha=0.3, color='#666666')
-                ax.set_xlabel('Amount (Millions of Dollars)', 
-                            fontsize=14, 
-                            labelpad=15,
-                            fontweight='bold')
-                ax.set_yticks([])  
-                
-                for spine in ax.spines.values():
-                    spine.set_visible(False)
-                
-                if len(fund_types) > 1:
-                    # Create legend with proper formatting
-                    legend = ax.legend(
-                        handles=bars_list,
-                        labels=fund_types,  # Explicitly set labels from fund_types
-                        bbox_to_anchor=(0.5, -0.15), 
-                        loc='upper center',
-                        ncol=min(4, len(fund_types)),  # Limit columns for better layout
-                        frameon=False,
-                        fontsize=12,
-                        handletextpad=0.8,
-                        columnspacing=1.5,
-                        borderpad=1.0
-                    )
-                    
-                    # Make legend text bold and set proper color
-                    for text in legend.get_texts():
-                        text.set_fontweight('bold')
-                        text.set_color('#2c3e50')  # Dark gray for better readability
+# Columns read from the allocations CSV; the low-cardinality strings load as
+# categoricals so grouping works on integer codes
+CSV_DTYPES = {
+    'department_code': 'category',
+    'section': 'category',
+    'fund_type': 'category',
+    'amount': 'float64',
+}
 
-            plt.tight_layout(pad=3.0)
-            
-            # Set title with improved styling
-            ax.set_title(
-                f'{summary["department_code"]} Operating Budget (FY26)',
-                fontsize=24,
-                pad=20,
-                fontweight='bold',
-                color='#2c3e50'
-            )
-            
-            # Save to bytes buffer with high quality settings
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            
-            # Encode to base64
-            data = base64.b64encode(buf.getbuffer()).decode('ascii')
-            return data
-            
-        except Exception as e:
-            logger.error(f"Error creating chart for {summary.get('department_code', 'unknown')}: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            
-            # Return a simple placeholder image as base64
-            try:
-                fig, ax = plt.subplots(figsize=(10, 2))
-                ax.text(0.5, 0.5, f'Chart Error: {str(e)[:50]}...', 
-                       ha='center', va='center', fontsize=10)
-                ax.axis('off')
-                
-                buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-                buffer.seek(0)
-                image_base64 = base64.b64encode(buffer.getvalue()).decode()
-                plt.close(fig)
-                plt.clf()
-                
-                return image_base64
-            except:
-                return ""
-    
-    def _load_descriptions(self, descriptions_file: str) -> dict:
-        """
-        Load department descriptions from a JSON file.
-        
-        Args:
-            descriptions_file: Path to the JSON file containing department descriptions
-            
-        Returns:
-            Dictionary mapping department codes to their descriptions
-        """
-        try:
-            with open(descriptions_file, 'r', encoding='utf-8') as f:
-                descriptions = json.load(f)
-            logger.info(f"Loaded descriptions for {len(descriptions)} departments")
-            return descriptions
-        except FileNotFoundError:
-            logger.warning(f"Department descriptions file not found: {descriptions_file}")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing department descriptions: {e}")
-            return {}
-    
-    def get_department_description(self, dept_code: str) -> str:
-        """
-        Get the description for a department.
-        
-        Args:
-            dept_code: Department code (e.g., 'AGR')
-            
-        Returns:
-            Department description as a string
-        """
-        # Get the display name for the department
-        display_name = self.display_names.get(dept_code, dept_code)
-        
-        # Try to get the description for the department
-        dept_info = self.descriptions.get(dept_code, {})
-        
-        # If we have a description, use it
-        if 'description' in dept_info:
-            return dept_info['description']
-            
-        # Otherwise, use the display name with a default message
-        return f"{display_name} is a department of the State of Hawaii. {DEFAULT_DEPT_DESCRIPTION}"
-    
-    def _get_css_styles(self) -> str:
-        """Return the CSS styles for the HTML report."""
-        return """
+# Fund type mappings to match the reference
+FUND_MAPPINGS = MappingProxyType({
+    'A': 'General Funds',
+    'B': 'Special Funds', 
+    'N': 'Federal Funds',
+    'P': 'Federal Funds',  # Other Federal Funds -> Federal Funds
+    'W': 'Other Funds',    # Revolving Funds -> Other Funds
+    'T': 'Other Funds',    # Trust Funds -> Other Funds
+    'U': 'Other Funds',    # Interdepartmental Transfers -> Other Funds
+    'R': 'Other Funds',    # Reimbursements -> Other Funds
+    'S': 'Other Funds'     # Other Special Funds -> Other Funds
+})
+
+# Colors for charts (matching official style)
+FUND_COLORS = MappingProxyType({
+    'General Funds': '#1f77b4',      # Blue
+    'Special Funds': '#2ca02c',      # Green  
+    'Federal Funds': '#2c3e50',      # Dark blue/gray
+    'Other Funds': '#17a2b8'         # Cyan
+})
+
+# Department code to full name mapping
+DEPARTMENT_NAMES = MappingProxyType({
+    'AGR': 'AGRICULTURE AND BIOSECURITY',
+    'AGS': 'ACCOUNTING AND GENERAL SERVICES',
+    'ATG': 'ATTORNEY GENERAL',
+    'BED': 'BUSINESS, ECONOMIC DEVELOPMENT, AND TOURISM',
+    'BUF': 'BUDGET AND FINANCE',
+    'CCA': 'COMMERCE AND CONSUMER AFFAIRS',
+    'CCH': 'CITY AND COUNTY OF HONOLULU',
+    'COH': 'COUNTY OF HAWAII',
+    'COK': 'COUNTY OF KAUAI',
+    'COM': 'COUNTY OF MAUI',
+    'DEF': 'DEFENSE',
+    'EDN': 'EDUCATION',
+    'GOV': 'GOVERNOR',
+    'HHL': 'HAWAIIAN HOME LANDS',
+    'HMS': 'HUMAN SERVICES',
+    'HRD': 'HUMAN RESOURCES DEVELOPMENT',
+    'HTH': 'HEALTH',
+    'LAW': 'LAW ENFORCEMENT',
+    'LBR': 'LABOR AND INDUSTRIAL RELATIONS',
+    'LNR': 'LAND AND NATURAL RESOURCES',
+    'LTG': 'LIEUTENANT GOVERNOR',
+    'P': 'LEGISLATURE',
+    'PSD': 'CORRECTIONS AND REHABILITATION',
+    'SUB': 'SUBSIDIES',
+    'TAX': 'TAXATION',
+    'TRN': 'TRANSPORTATION',
+    'UOH': 'UNIVERSITY OF HAWAII'
+})
+
+# Department code to display name mapping (for the descriptions)
+DISPLAY_NAMES = MappingProxyType({
+    'AGR': 'Department of Agriculture and Biosecurity',
+    'AGS': 'Department of Accounting and General Services',
+    'ATG': 'Department of the Attorney General',
+    'BED': 'Department of Business, Economic Development, and Tourism',
+    'BUF': 'Department of Budget and Finance',
+    'CCA': 'Department of Commerce and Consumer Affairs',
+    'CCH': 'City and County of Honolulu',
+    'COH': 'County of Hawaii',
+    'COK': 'County of Kauai',
+    'COM': 'County of Maui',
+    'DEF': 'Department of Defense',
+    'EDN': 'Department of Education',
+    'GOV': 'Office of the Governor',
+    'HHL': 'Department of Hawaiian Home Lands',
+    'HMS': 'Department of Human Services',
+    'HRD': 'Department of Human Resources Development',
+    'HTH': 'Department of Health',
+    'LAW': 'Department of Law Enforcement',
+    'LBR': 'Department of Labor and Industrial Relations',
+    'LNR': 'Department of Land and Natural Resources',
+    'LTG': 'Office of the Lieutenant Governor',
+    'P': 'State Legislature',
+    'PSD': 'Department of Corrections and Rehabilitation',
+    'SUB': 'Subsidies',
+    'TAX': 'Department of Taxation',
+    'TRN': 'Department of Transportation',
+    'UOH': 'University of Hawaii'
+})
+
+# The index page is streamed to disk through a 1 MiB buffer
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Parsed CSVs are cached here between runs, at the repository root whatever
+# the working directory, keyed by file mtime and size and the pandas version
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'generate_departmental_reports'
+
+# Fund categories shown in reports, in display order
+FUND_CATEGORIES = ['General Funds', 'Special Funds', 'Federal Funds', 'Other Funds']
+
+# Stylesheet shared by every department report, written once next to them
+REPORT_STYLESHEET = 'styles.css'
+REPORT_CSS = """
         body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             max-width: 800px;
@@ -563,6 +249,14 @@ class DepartmentalBudgetAnalyzer:
             text-align: center;
         }
         
+        .chart-container svg {
+            width: 100%;
+            height: auto;
+            max-height: 600px;
+            margin: 0 auto;
+            display: block;
+        }
+        
         .chart-container img {
             max-width: 100%;
             height: auto;
@@ -662,334 +356,139 @@ class DepartmentalBudgetAnalyzer:
             color: #4a5568;
         }
         """
+
+# Department report page around the summary cards, budget table and chart;
+# filled per department with str.format_map
+REPORT_HEADER = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{dept_code} FY26 Budget Report</title>
+    <link rel="stylesheet" href="{stylesheet}">
+</head>
+<body>
+    <div class="header">
+        <h1>{dept_code} FY26 Operating Budget</h1>
+        <h2>{dept_name}</h2>
+    </div>
     
-    def _format_currency(self, amount: float) -> str:
-        """Format currency amounts for display with up to 2 decimal places."""
-        if amount >= 1_000_000_000:
-            value = amount / 1_000_000_000
-            if value == int(value):
-                return f"${value:,.0f}B"
-            elif value * 10 == int(value * 10):
-                return f"${value:,.1f}B"
-            else:
-                return f"${value:,.2f}B"
-        else:
-            value = amount / 1_000_000
-            if value == int(value):
-                return f"${value:,.0f}M"
-            elif value * 10 == int(value * 10):
-                return f"${value:,.1f}M"
-            else:
-                return f"${value:,.2f}M"
+    <div class="dept-description">
+        <h3>About {dept_name}</h3>
+        <p>{dept_description}</p>
+    </div>
     
-    def _format_currency_long(self, amount: float) -> str:
-        """Format currency amounts for display with long form and up to 2 decimal places."""
-        if amount >= 1_000_000_000:
-            value = amount / 1_000_000_000
-            if value == int(value):
-                return f"${value:,.0f} Billion"
-            elif value * 10 == int(value * 10):
-                return f"${value:,.1f} Billion"
-            else:
-                return f"${value:,.2f} Billion"
-        else:
-            value = amount / 1_000_000
-            if value == int(value):
-                return f"${value:,.0f} Million"
-            elif value * 10 == int(value * 10):
-                return f"${value:,.1f} Million"
-            else:
-                return f"${value:,.2f} Million"
+    """
+
+REPORT_SECTION_BREAK = """
     
-    def _build_summary_cards(self, summary: dict) -> str:
-        """Build the summary cards section."""
-        operating_total = summary['operating_budget']['total']
-        one_time_total = summary['one_time_appropriations']['total']
-        cip_total = summary['cip_projects']
-        
-        # Build cards - always show operating and CIP, conditionally show one-time
-        cards_html = f"""
-        <div class="budget-card">
-            <div class="budget-amount">{self._format_currency(operating_total)}</div>
-            <div class="budget-label">Operating Budget</div>
-        </div>"""
-        
-        # Add one-time appropriations card if there are any
-        if one_time_total > 0:
-            cards_html += f"""
-        <div class="budget-card">
-            <div class="budget-amount">{self._format_currency(one_time_total)}</div>
-            <div class="budget-label">One-Time Appropriations</div>
-        </div>"""
-        
-        cards_html += f"""
+    """
+
+REPORT_FOOTER = """
+    
+    <div class="footer">
+        <p>Generated from Hawaii State Budget FY 2026 Post-Veto Data</p>
+        <p>Data source: HB300 CD1 - State of Hawaii Operating and Capital Budget</p>
+    </div>
+</body>
+</html>
+"""
+
+
+# One summary card at the top of a department report
+SUMMARY_CARD = """
         <div class="budget-card">
-            <div class="budget-amount">{self._format_currency(cip_total)}</div>
-            <div class="budget-label">Capital Improvement Projects</div>
+            <div class="budget-amount">{amount}</div>
+            <div class="budget-label">{label}</div>
         </div>"""
-        
-        return f"""
-    <div class="summary-stats">
-        {cards_html}
-    </div>"""
-    
-    def _build_budget_table(self, summary: dict) -> str:
-        """Build the budget breakdown table."""
-        op_budget = summary['operating_budget']
-        one_time_budget = summary['one_time_appropriations']
-        dept_code = summary['department_code']
-        
-        # Build operating budget section
-        table_html = f"""
+
+# Department budget table: the operating section, the optional one-time
+# section and the closing CIP row
+BUDGET_TABLE_OPERATING = """
     <table class="budget-table">
         <thead>
             <tr>
                 <th>{dept_code} FY26 Operating Budget:</th>
-                <th class="amount">{self._format_currency_long(op_budget['total'])}</th>
+                <th class="amount">{total}</th>
             </tr>
         </thead>
         <tbody>
             <tr>
                 <td>General Funds:</td>
-                <td class="amount">{self._format_currency(op_budget['General Funds'])}</td>
+                <td class="amount">{general}</td>
             </tr>
             <tr>
                 <td>Special Funds:</td>
-                <td class="amount">{self._format_currency(op_budget['Special Funds'])}</td>
+                <td class="amount">{special}</td>
             </tr>
             <tr>
                 <td>Federal Funds:</td>
-                <td class="amount">{self._format_currency(op_budget['Federal Funds'])}</td>
+                <td class="amount">{federal}</td>
             </tr>
             <tr>
                 <td>Other Funds:</td>
-                <td class="amount">{self._format_currency(op_budget['Other Funds'])}</td>
+                <td class="amount">{other}</td>
             </tr>"""
-        
-        # Add one-time appropriations section if there are any
-        if one_time_budget['total'] > 0:
-            table_html += f"""
+
+BUDGET_TABLE_ONE_TIME = """
             <tr class="total-row">
                 <td>FY26 One-Time Appropriations:</td>
-                <td class="amount">{self._format_currency_long(one_time_budget['total'])}</td>
+                <td class="amount">{total}</td>
             </tr>
             <tr>
                 <td>General Funds:</td>
-                <td class="amount">{self._format_currency(one_time_budget['General Funds'])}</td>
+                <td class="amount">{general}</td>
             </tr>
             <tr>
                 <td>Special Funds:</td>
-                <td class="amount">{self._format_currency(one_time_budget['Special Funds'])}</td>
+                <td class="amount">{special}</td>
             </tr>
             <tr>
                 <td>Federal Funds:</td>
-                <td class="amount">{self._format_currency(one_time_budget['Federal Funds'])}</td>
+                <td class="amount">{federal}</td>
             </tr>
             <tr>
                 <td>Other Funds:</td>
-                <td class="amount">{self._format_currency(one_time_budget['Other Funds'])}</td>
+                <td class="amount">{other}</td>
             </tr>"""
-        
-        # Add CIP section
-        table_html += f"""
+
+BUDGET_TABLE_CIP = """
             <tr class="total-row">
                 <td>FY26 Capital Improvement Projects:</td>
-                <td class="amount">{self._format_currency_long(summary['cip_projects'])}</td>
+                <td class="amount">{total}</td>
             </tr>
         </tbody>
     </table>"""
-        
-        return table_html
-    
-    def _build_chart_section(self, summary: dict, chart_base64: str) -> str:
-        """Build the chart section."""
-        dept_code = summary['department_code']
-        
-        return f"""
-    <div class="chart-container">
-        <h3>Figure 15. {dept_code} Operating Budget</h3>
-        <div class="chart-wrapper">
-            <img src="data:image/png;base64,{chart_base64}" alt="{dept_code} Budget Chart">
-        </div>
-    </div>"""
-    
-    def generate_html_report(self, summary: dict) -> str:
-        """
-        Generate HTML report for a department using template-based approach.
-        
-        Args:
-            summary: Department summary dictionary
-            
-        Returns:
-            HTML string
-        """
-        # Generate chart
-        chart_base64 = self.create_department_chart(summary)
-        
-        # Get department info
-        dept_code = summary['department_code']
-        dept_name = summary['department_name']
-        dept_description = self.get_department_description(dept_code)
-        
-        # Build template sections
-        css_styles = self._get_css_styles()
-        summary_cards = self._build_summary_cards(summary)
-        budget_table = self._build_budget_table(summary)
-        chart_section = self._build_chart_section(summary, chart_base64)
-        
-        # Assemble the complete HTML
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{dept_code} FY26 Budget Report</title>
-    <style>{css_styles}</style>
-</head>
-<body>
-    <div class="header">
-        <h1>{dept_code} FY26 Operating Budget</h1>
-        <h2>{dept_name}</h2>
-    </div>
-    
-    <div class="dept-description">
-        <h3>About {dept_name}</h3>
-        <p>{dept_description}</p>
-    </div>
-    
-    {summary_cards}
-    
-    {budget_table}
-    
-    {chart_section}
-    
-    <div class="footer">
-        <p>Generated from Hawaii State Budget FY 2026 Post-Veto Data</p>
-        <p>Data source: HB300 CD1 - State of Hawaii Operating and Capital Budget</p>
-    </div>
-</body>
-</html>
+
+# Department card on the index page and one line of its budget breakdown
+INDEX_CARD_TEMPLATE = """
+        <a href="{code_lc}_budget_report.html" class="dept-card" data-operating="{operating}" data-capital="{capital}" data-onetime="{one_time}" data-search="{search}">
+            <div class="dept-name">{name}</div>
+            <div class="dept-code">{code}</div>
+            <div class="dept-budget">{total} Total Budget</div>
+            <div class="dept-breakdown">
+                {breakdown_items}
+            </div>
+        </a>
 """
-        return html_content
-    
-    def generate_all_reports(self):
-        """Generate HTML reports for all departments."""
-        # Get all unique department codes
-        dept_codes = sorted(self.df['department_code'].unique())
-        
-        logger.info(f"Generating reports for {len(dept_codes)} departments")
-        
-        # Create index page
-        index_html = self.create_index_page(dept_codes)
-        index_path = self.output_dir / "index.html"
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(index_html)
-        logger.info(f"Created index page: {index_path}")
-        
-        # Generate individual department reports
-        for dept_code in dept_codes:
-            try:
-                logger.info(f"Processing department: {dept_code}")
-                summary = self.get_department_summary(dept_code)
-                if summary:
-                    logger.info(f"Got summary for {dept_code}, generating HTML report...")
-                    html_report = self.generate_html_report(summary)
-                    
-                    # Save to file
-                    filename = f"{dept_code.lower()}_budget_report.html"
-                    filepath = self.output_dir / filename
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(html_report)
-                    
-                    logger.info(f"Successfully generated report for {dept_code}: {filepath}")
-                else:
-                    logger.warning(f"Skipped {dept_code} - no data available")
-                    
-            except Exception as e:
-                logger.error(f"Error generating report for {dept_code}: {e}")
-                logger.error(f"Full traceback: {traceback.format_exc()}")
-                # Continue with next department instead of stopping
-    
-    def create_index_page(self, dept_codes: list) -> str:
-        """Create an index page linking to all department reports."""
-        # Get department names and budget breakdown
-        dept_info = []
-        for code in dept_codes:
-            dept_data = self.df[self.df['department_code'] == code]
-            if not dept_data.empty:
-                # Use full department name from mapping
-                name = self.department_names.get(code, code)
-                total = dept_data['amount'].sum() / 1_000_000
-                
-                # Calculate operating vs capital vs one-time breakdown
-                operating = dept_data[dept_data['section'] == 'Operating']['amount'].sum() / 1_000_000
-                capital = dept_data[dept_data['section'] == 'Capital Improvement']['amount'].sum() / 1_000_000
-                one_time = dept_data[dept_data['section'] == 'One-Time']['amount'].sum() / 1_000_000
-                
-                dept_info.append((code, name, total, operating, capital, one_time))
-        
-        # Sort by operating budget (descending), then by total budget (descending)
-        dept_info.sort(key=lambda x: (-x[3], -x[2]))  # x[3] is operating budget, x[2] is total budget
-        
-        # Calculate totals for summary cards
-        total_budget = sum(info[2] for info in dept_info)
-        total_departments = len(dept_info)
-        largest_dept = dept_info[0] if dept_info else ('', '', 0)
-        
-        # Calculate operating vs capital vs one-time budget totals
-        operating_total = self.df[self.df['section'] == 'Operating']['amount'].sum() / 1_000_000
-        capital_total = self.df[self.df['section'] == 'Capital Improvement']['amount'].sum() / 1_000_000
-        one_time_total = self.df[self.df['section'] == 'One-Time']['amount'].sum() / 1_000_000
-        
-        # Helper function to format budget amounts with up to 2 decimal places
-        def format_budget(amount_millions):
-            if amount_millions >= 1000:
-                value = amount_millions / 1000
-                if value == int(value):
-                    return f"${value:,.0f}B"
-                elif value * 10 == int(value * 10):
-                    return f"${value:,.1f}B"
-                else:
-                    return f"${value:,.2f}B"
-            else:
-                if amount_millions == int(amount_millions):
-                    return f"${amount_millions:,.0f}M"
-                elif amount_millions * 10 == int(amount_millions * 10):
-                    return f"${amount_millions:,.1f}M"
-                else:
-                    return f"${amount_millions:,.2f}M"
-        
-        # Prepare chart data JSON for embedding in the JavaScript code
-        chart_data = [
-            {
-                "code": code,
-                "name": name,
-                "operating": operating,
-                "capital": capital,
-                "one_time": one_time
-            } for code, name, total, operating, capital, one_time in dept_info
-        ]
-        chart_data_json = json.dumps(chart_data)
-        print(f"DEBUG: chart_data_json = {chart_data_json}")
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Hawaii State Budget FY 2026 - Departmental Reports</title>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        * {{
+
+INDEX_BREAKDOWN_ITEM = """
+                <div class="breakdown-item">
+                    <span class="breakdown-label">{label}:</span>
+                    <span class="breakdown-value">{value}</span>
+                </div>"""
+
+# Stylesheet for the index page, written once next to it
+INDEX_STYLESHEET = 'index.css'
+INDEX_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             max-width: 1400px;
             margin: 0 auto;
@@ -999,113 +498,113 @@ class DepartmentalBudgetAnalyzer:
             background: linear-gradient(135deg, #007fb2 0%, #005a7d 100%);
             min-height: 100vh;
             font-size: 16px;
-        }}
+        }
         
-        .header {{
+        .header {
             text-align: center;
             margin-bottom: 40px;
             padding: 40px;
             background-color: #fff;
             border-radius: 16px;
             box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             color: #1a202c;
             margin: 0 0 12px 0;
             font-size: 3rem;
             font-weight: 700;
             letter-spacing: -0.025em;
-        }}
+        }
         
-        .header p {{
+        .header p {
             color: #4a5568;
             font-size: 1.25rem;
             font-weight: 400;
             margin: 0;
-        }}
+        }
         
-        .summary-section {{
+        .summary-section {
             margin-bottom: 40px;
-        }}
+        }
         
-        .summary-cards {{
+        .summary-cards {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
             gap: 24px;
             margin-bottom: 32px;
-        }}
+        }
         
-        .summary-card {{
+        .summary-card {
             background: linear-gradient(135deg, #f0f8ff 0%, #e6f3ff 100%);
             border-radius: 16px;
             padding: 32px;
             box-shadow: 0 4px 20px rgba(0,127,178,0.1);
             border: 1px solid rgba(0,127,178,0.1);
             transition: transform 0.2s ease, box-shadow 0.2s ease;
-        }}
+        }
         
-        .summary-card:hover {{
+        .summary-card:hover {
             transform: translateY(-2px);
             box-shadow: 0 8px 30px rgba(0,0,0,0.12);
-        }}
+        }
         
-        .summary-card h3 {{
+        .summary-card h3 {
             font-size: 0.875rem;
             font-weight: 600;
             color: #4a5568;
             text-transform: uppercase;
             letter-spacing: 0.05em;
             margin-bottom: 8px;
-        }}
+        }
         
-        .summary-card .value {{
+        .summary-card .value {
             font-size: 2.5rem;
             font-weight: 700;
             color: #1a202c;
             line-height: 1;
             margin-bottom: 4px;
-        }}
+        }
         
-        .summary-card .label {{
+        .summary-card .label {
             font-size: 1rem;
             color: #718096;
             font-weight: 500;
-        }}
+        }
         
-        .search-section {{
+        .search-section {
             background-color: #fff;
             border-radius: 16px;
             padding: 32px;
             margin-bottom: 32px;
             box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        }}
+        }
         
-        .search-container {{
+        .search-container {
             position: relative;
             max-width: 800px;
             margin: 0 auto;
-        }}
+        }
         
-        .search-row {{
+        .search-row {
             display: flex;
             flex-direction: column;
             gap: 16px;
-        }}
+        }
         
-        .search-input-container {{
+        .search-input-container {
             position: relative;
             width: 100%;
-        }}
+        }
         
-        .sort-buttons {{
+        .sort-buttons {
             display: flex;
             gap: 12px;
             justify-content: flex-start;
             flex-wrap: wrap;
-        }}
+        }
         
-        .sort-btn {{
+        .sort-btn {
             display: flex;
             align-items: center;
             gap: 6px;
@@ -1118,29 +617,29 @@ class DepartmentalBudgetAnalyzer:
             color: #475569;
             cursor: pointer;
             transition: all 0.2s ease;
-        }}
+        }
         
-        .sort-btn:hover {{
+        .sort-btn:hover {
             background-color: #e2e8f0;
             border-color: #cbd5e1;
-        }}
+        }
         
-        .sort-btn.active {{
+        .sort-btn.active {
             background-color: #007fb2;
             border-color: #007fb2;
             color: white;
-        }}
+        }
         
-        .sort-arrow {{
+        .sort-arrow {
             font-size: 0.8rem;
             transition: transform 0.2s ease;
-        }}
+        }
         
-        .sort-btn[data-order="asc"] .sort-arrow {{
+        .sort-btn[data-order="asc"] .sort-arrow {
             transform: rotate(180deg);
-        }}
+        }
         
-        .search-input {{
+        .search-input {
             width: 100%;
             padding: 16px 24px 16px 48px;
             font-size: 1.125rem;
@@ -1149,32 +648,32 @@ class DepartmentalBudgetAnalyzer:
             background-color: #f8fafc;
             transition: all 0.2s ease;
             font-family: inherit;
-        }}
+        }
         
-        .search-input:focus {{
+        .search-input:focus {
             outline: none;
             border-color: #007fb2;
             background-color: #fff;
             box-shadow: 0 0 0 3px rgba(0, 127, 178, 0.1);
-        }}
+        }
         
-        .search-icon {{
+        .search-icon {
             position: absolute;
             left: 16px;
             top: 50%;
             transform: translateY(-50%);
             color: #a0aec0;
             font-size: 1.25rem;
-        }}
+        }
         
-        .departments-grid {{
+        .departments-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
             gap: 24px;
             margin: 32px 0;
-        }}
+        }
         
-        .dept-card {{
+        .dept-card {
             background: linear-gradient(135deg, #f8fcff 0%, #eef7ff 100%);
             border-radius: 16px;
             padding: 32px;
@@ -1185,9 +684,9 @@ class DepartmentalBudgetAnalyzer:
             border: 1px solid rgba(0,127,178,0.15);
             position: relative;
             overflow: hidden;
-        }}
+        }
         
-        .dept-card::before {{
+        .dept-card::before {
             content: '';
             position: absolute;
             top: 0;
@@ -1195,25 +694,25 @@ class DepartmentalBudgetAnalyzer:
             right: 0;
             height: 4px;
             background: linear-gradient(90deg, #007fb2 0%, #005a7d 100%);
-        }}
+        }
         
-        .dept-card:hover {{
+        .dept-card:hover {
             transform: translateY(-8px);
             box-shadow: 0 20px 40px rgba(0,0,0,0.15);
             text-decoration: none;
             color: inherit;
-        }}
+        }
         
-        .dept-name {{
+        .dept-name {
             font-size: 1.375rem;
             font-weight: 600;
             color: #1a202c;
             margin-bottom: 12px;
             line-height: 1.3;
             letter-spacing: -0.025em;
-        }}
+        }
         
-        .dept-code {{
+        .dept-code {
             font-size: 0.75rem;
             font-weight: 600;
             color: #007fb2;
@@ -1224,84 +723,84 @@ class DepartmentalBudgetAnalyzer:
             margin-bottom: 16px;
             text-transform: uppercase;
             letter-spacing: 0.05em;
-        }}
+        }
         
-        .dept-budget {{
+        .dept-budget {
             color: #38a169;
             font-weight: 700;
             font-size: 1.5rem;
             letter-spacing: -0.025em;
             margin-bottom: 16px;
-        }}
+        }
         
-        .dept-breakdown {{
+        .dept-breakdown {
             display: flex;
             gap: 16px;
             margin-top: 8px;
-        }}
+        }
         
-        .breakdown-item {{
+        .breakdown-item {
             display: flex;
             flex-direction: column;
             align-items: flex-start;
             flex: 1;
-        }}
+        }
         
-        .breakdown-label {{
+        .breakdown-label {
             font-size: 0.75rem;
             font-weight: 500;
             color: #718096;
             text-transform: uppercase;
             letter-spacing: 0.05em;
             margin-bottom: 4px;
-        }}
+        }
         
-        .breakdown-value {{
+        .breakdown-value {
             font-size: 1rem;
             font-weight: 600;
             color: #2d3748;
-        }}
+        }
         
-        .chart-section {{
+        .chart-section {
             margin-bottom: 40px;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             background-color: #fff;
             border-radius: 16px;
             padding: 40px;
             box-shadow: 0 4px 20px rgba(0,127,178,0.08);
             border: 1px solid rgba(0,127,178,0.1);
-        }}
+        }
         
-        .chart-title {{
+        .chart-title {
             font-size: 1.75rem;
             font-weight: 600;
             color: #1a202c;
             margin-bottom: 32px;
             text-align: center;
-        }}
+        }
         
-        .chart-wrapper {{
+        .chart-wrapper {
             display: flex;
             flex-direction: column;
             gap: 16px;
             max-height: 600px;
             overflow-y: auto;
-        }}
+        }
         
-        .dept-chart-row {{
+        .dept-chart-row {
             display: flex;
             align-items: center;
             padding: 12px 0;
             border-bottom: 1px solid #e2e8f0;
-        }}
+        }
         
-        .dept-chart-row:last-child {{
+        .dept-chart-row:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .dept-label {{
+        .dept-label {
             width: 200px;
             font-size: 0.875rem;
             font-weight: 600;
@@ -1310,59 +809,59 @@ class DepartmentalBudgetAnalyzer:
             flex-shrink: 0;
             cursor: pointer;
             transition: color 0.2s ease;
-        }}
+        }
         
-        .dept-label:hover {{
+        .dept-label:hover {
             color: #005a7d;
             text-decoration: underline;
-        }}
+        }
         
-        .chart-bars {{
+        .chart-bars {
             display: flex;
             flex: 1;
             gap: 8px;
             align-items: center;
             margin-left: 16px;
-        }}
+        }
         
-        .bar-group {{
+        .bar-group {
             display: flex;
             flex-direction: column;
             gap: 4px;
             flex: 1;
-        }}
+        }
         
-        .bar-container {{
+        .bar-container {
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
+        }
         
-        .bar-label {{
+        .bar-label {
             font-size: 0.75rem;
             font-weight: 500;
             color: #4a5568;
             width: 60px;
             text-align: right;
-        }}
+        }
         
-        .bar {{
+        .bar {
             height: 20px;
             border-radius: 4px;
             position: relative;
             min-width: 2px;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .bar-operating {{
+        .bar-operating {
             background: linear-gradient(90deg, #007fb2 0%, #0099d4 100%);
-        }}
+        }
         
-        .bar-capital {{
+        .bar-capital {
             background: linear-gradient(90deg, #38a169 0%, #48bb78 100%);
-        }}
+        }
         
-        .bar-value {{
+        .bar-value {
             position: absolute;
             right: 8px;
             top: 50%;
@@ -1371,44 +870,44 @@ class DepartmentalBudgetAnalyzer:
             font-weight: 600;
             color: white;
             text-shadow: 0 1px 2px rgba(0,0,0,0.3);
-        }}
+        }
         
-        .chart-legend {{
+        .chart-legend {
             display: flex;
             justify-content: center;
             gap: 24px;
             margin-top: 24px;
             padding-top: 16px;
             border-top: 1px solid #e2e8f0;
-        }}
+        }
         
-        .legend-item {{
+        .legend-item {
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
+        }
         
-        .legend-color {{
+        .legend-color {
             width: 16px;
             height: 16px;
             border-radius: 4px;
-        }}
+        }
         
-        .legend-operating {{
+        .legend-operating {
             background: linear-gradient(90deg, #007fb2 0%, #0099d4 100%);
-        }}
+        }
         
-        .legend-capital {{
+        .legend-capital {
             background: linear-gradient(90deg, #38a169 0%, #48bb78 100%);
-        }}
+        }
         
-        .legend-text {{
+        .legend-text {
             font-size: 0.875rem;
             font-weight: 500;
             color: #4a5568;
-        }}
+        }
         
-        .footer {{
+        .footer {
             margin-top: 60px;
             padding: 32px;
             background-color: #fff;
@@ -1416,35 +915,48 @@ class DepartmentalBudgetAnalyzer:
             text-align: center;
             color: #4a5568;
             box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        }}
+        }
         
-        .footer p {{
+        .footer p {
             font-size: 0.875rem;
             font-weight: 500;
-        }}
+        }
         
-        .hidden {{
+        .hidden {
             display: none !important;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .header h1 {{
+        @media (max-width: 768px) {
+            .header h1 {
                 font-size: 2.25rem;
-            }}
+            }
             
-            .summary-cards {{
+            .summary-cards {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .departments-grid {{
+            .departments-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .dept-card {{
+            .dept-card {
                 padding: 24px;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# Index page, written as header, department cards, footer. The header is a
+# string.Template so the page's braces need no escaping
+INDEX_PAGE_HEADER = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Hawaii State Budget FY 2026 - Departmental Reports</title>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="$stylesheet">
+    <script src="$script" defer></script>
 </head>
 <body>
     <div class="header">
@@ -1456,35 +968,35 @@ class DepartmentalBudgetAnalyzer:
         <div class="summary-cards">
             <div class="summary-card">
                 <h3>Total Budget</h3>
-                <div class="value">{format_budget(total_budget)}</div>
+                <div class="value">$total_budget</div>
                 <div class="label">All Departments</div>
             </div>
             <div class="summary-card">
                 <h3>Departments</h3>
-                <div class="value">{total_departments}</div>
+                <div class="value">$total_departments</div>
                 <div class="label">State Agencies</div>
             </div>
             <div class="summary-card">
                 <h3>Largest Department</h3>
-                <div class="value">{format_budget(largest_dept[2])}</div>
-                <div class="label">{largest_dept[1]}</div>
+                <div class="value">$largest_budget</div>
+                <div class="label">$largest_name</div>
             </div>
         </div>
         
         <div class="summary-cards">
             <div class="summary-card">
                 <h3>Operating Budget</h3>
-                <div class="value">{format_budget(operating_total)}</div>
+                <div class="value">$operating_total</div>
                 <div class="label">All Departments Combined</div>
             </div>
             <div class="summary-card">
                 <h3>One-Time Appropriations</h3>
-                <div class="value">{format_budget(one_time_total)}</div>
+                <div class="value">$one_time_total</div>
                 <div class="label">Special Allocations</div>
             </div>
             <div class="summary-card">
                 <h3>Capital Budget</h3>
-                <div class="value">{format_budget(capital_total)}</div>
+                <div class="value">$capital_total</div>
                 <div class="label">Capital Improvement Projects</div>
             </div>
         </div>
@@ -1513,183 +1025,1148 @@ class DepartmentalBudgetAnalyzer:
     </div>
     
     <div class="departments-grid" id="departmentsGrid">
-"""
-        
-        for code, name, total, operating, capital, one_time in dept_info:
-            # Format the budget amounts with up to 2 decimal places
-            def format_amount(amount):
-                if amount >= 1000:
-                    value = amount / 1000
-                    if value == int(value):
-                        return f"${value:,.0f}B"
-                    elif value * 10 == int(value * 10):
-                        return f"${value:,.1f}B"
-                    else:
-                        return f"${value:,.2f}B"
-                else:
-                    if amount == int(amount):
-                        return f"${amount:,.0f}M"
-                    elif amount * 10 == int(amount * 10):
-                        return f"${amount:,.1f}M"
-                    else:
-                        return f"${amount:,.2f}M"
-            
-            total_display = format_amount(total)
-            operating_display = format_amount(operating)
-            capital_display = format_amount(capital)
-            one_time_display = format_amount(one_time)
-            
-            # Build breakdown items - always show operating and capital, conditionally show one-time
-            breakdown_items = f"""
-                <div class="breakdown-item">
-                    <span class="breakdown-label">Operating:</span>
-                    <span class="breakdown-value">{operating_display}</span>
-                </div>"""
-            
-            if one_time > 0:
-                breakdown_items += f"""
-                <div class="breakdown-item">
-                    <span class="breakdown-label">One-Time:</span>
-                    <span class="breakdown-value">{one_time_display}</span>
-                </div>"""
-            
-            breakdown_items += f"""
-                <div class="breakdown-item">
-                    <span class="breakdown-label">Capital:</span>
-                    <span class="breakdown-value">{capital_display}</span>
-                </div>"""
-            
-            html += f"""
-        <a href="{code.lower()}_budget_report.html" class="dept-card" data-operating="{operating}" data-capital="{capital}" data-onetime="{one_time}">
-            <div class="dept-name">{name}</div>
-            <div class="dept-code">{code}</div>
-            <div class="dept-budget">{total_display} Total Budget</div>
-            <div class="dept-breakdown">
-                {breakdown_items}
-            </div>
-        </a>
-"""
-        
-        html += """
+""")
+
+INDEX_PAGE_FOOTER = """
     </div>
     
     <div class="footer">
         <p>Generated from Hawaii State Budget FY 2026 Post-Veto Data</p>
         <p>Data source: HB300 CD1 - State of Hawaii Operating and Capital Budget</p>
     </div>
-    
-    <script>
-        // Search functionality
-        document.addEventListener('DOMContentLoaded', function() {
-            const searchInput = document.getElementById('searchInput');
-            const departmentsGrid = document.getElementById('departmentsGrid');
-            
-            // Create no results message element
-            const noResultsMsg = document.createElement('div');
-            noResultsMsg.id = 'noResultsMsg';
-            noResultsMsg.style.cssText = `
-                text-align: center;
-                padding: 2rem;
-                font-size: 1.1rem;
-                color: #666;
-                display: none;
-            `;
-            noResultsMsg.textContent = 'No departments found matching your search.';
-            departmentsGrid.parentNode.insertBefore(noResultsMsg, departmentsGrid.nextSibling);
-            
-            function performSearch() {
-                const searchTerm = searchInput.value.toLowerCase().trim();
-                const deptCards = departmentsGrid.querySelectorAll('.dept-card');
-                let hasVisibleCards = false;
-                
-                deptCards.forEach(card => {
-                    const deptName = card.querySelector('.dept-name').textContent.toLowerCase();
-                    const deptCode = card.querySelector('.dept-code').textContent.toLowerCase();
-                    
-                    if (searchTerm === '' || deptName.includes(searchTerm) || deptCode.includes(searchTerm)) {
-                        card.style.display = 'block';
-                        hasVisibleCards = true;
-                    } else {
-                        card.style.display = 'none';
-                    }
-                });
-                
-                // Show/hide no results message
-                noResultsMsg.style.display = (searchTerm !== '' && !hasVisibleCards) ? 'block' : 'none';
+</body>
+</html>
+"""
+
+# Index page search and sort, loaded as a deferred external script
+INDEX_SCRIPT = 'index.js'
+INDEX_JS = """
+// Search functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('searchInput');
+    const departmentsGrid = document.getElementById('departmentsGrid');
+
+    // Create no results message element
+    const noResultsMsg = document.createElement('div');
+    noResultsMsg.id = 'noResultsMsg';
+    noResultsMsg.style.cssText = `
+        text-align: center;
+        padding: 2rem;
+        font-size: 1.1rem;
+        color: #666;
+        display: none;
+    `;
+    noResultsMsg.textContent = 'No departments found matching your search.';
+    departmentsGrid.parentNode.insertBefore(noResultsMsg, departmentsGrid.nextSibling);
+
+    // Live collection: looked up once, and stays current when sorting
+    // re-appends the cards
+    const deptCards = departmentsGrid.getElementsByClassName('dept-card');
+
+    // Whether any card may currently be hidden by a search
+    let filtered = false;
+
+    function performSearch() {
+        const searchTerm = searchInput.value.toLowerCase().trim();
+
+        // An empty query shows every card: unhide them once after a
+        // search, and skip the loop entirely otherwise
+        if (searchTerm === '') {
+            if (filtered) {
+                for (const card of deptCards) card.classList.remove('hidden');
+                filtered = false;
             }
-            
-            // Sort departments function
-            function sortDepartments(sortBy, order) {
-                const deptCards = Array.from(departmentsGrid.querySelectorAll('.dept-card'));
-                
-                deptCards.sort((a, b) => {
-                    const aValue = parseFloat(a.dataset[sortBy]);
-                    const bValue = parseFloat(b.dataset[sortBy]);
-                    return order === 'desc' ? bValue - aValue : aValue - bValue;
-                });
-                
-                // Re-append cards in new order
-                deptCards.forEach(card => departmentsGrid.appendChild(card));
+            noResultsMsg.style.display = 'none';
+            return;
+        }
+        filtered = true;
+
+        let visibleCount = 0;
+        for (const card of deptCards) {
+            const visible = card.dataset.search.includes(searchTerm);
+            if (visible) visibleCount++;
+            // Only touch cards whose visibility changes, so typing
+            // another character doesn't restyle cards already hidden
+            if (card.classList.contains('hidden') === visible) {
+                card.classList.toggle('hidden', !visible);
             }
-            
-            // Handle sort button clicks
-            document.querySelectorAll('.sort-btn').forEach(btn => {
-                btn.addEventListener('click', function() {
-                    const sortBy = this.dataset.sort;
-                    const currentOrder = this.dataset.order;
-                    const newOrder = currentOrder === 'desc' ? 'asc' : 'desc';
-                    
-                    // Update button state
-                    this.dataset.order = newOrder;
-                    this.classList.add('active');
-                    this.querySelector('.sort-arrow').textContent = newOrder === 'desc' ? '↓' : '↑';
-                    
-                    // Reset other buttons
-                    document.querySelectorAll('.sort-btn').forEach(otherBtn => {
-                        if (otherBtn !== this) {
-                            otherBtn.classList.remove('active');
-                            otherBtn.dataset.order = 'desc';
-                            otherBtn.querySelector('.sort-arrow').textContent = '↓';
-                        }
-                    });
-                    
-                    // Sort departments
-                    sortDepartments(sortBy, newOrder);
-                });
-            });
-            
-            // Add event listeners
-            searchInput.addEventListener('input', performSearch);
-            searchInput.addEventListener('keyup', function(e) {
-                if (e.key === 'Escape') {
-                    searchInput.value = '';
-                    performSearch();
-                }
-            });
-            
-            // Focus search on Cmd+K / Ctrl+K
-            document.addEventListener('keydown', function(e) {
-                if ((e.ctrlKey || e.metaKey) && e.key === 'k') {
-                    e.preventDefault();
-                    searchInput.focus();
+        }
+
+        // Show/hide no results message
+        noResultsMsg.style.display = visibleCount === 0 ? 'block' : 'none';
+    }
+
+    // Sort departments function
+    function sortDepartments(sortBy, order) {
+        const sortedCards = Array.from(deptCards);
+
+        sortedCards.sort((a, b) => {
+            const aValue = parseFloat(a.dataset[sortBy]);
+            const bValue = parseFloat(b.dataset[sortBy]);
+            return order === 'desc' ? bValue - aValue : aValue - bValue;
+        });
+
+        // Re-append cards in new order
+        sortedCards.forEach(card => departmentsGrid.appendChild(card));
+    }
+
+    // Handle sort button clicks
+    // Sort buttons, looked up once rather than on every click
+    const sortButtons = document.querySelectorAll('.sort-btn');
+    sortButtons.forEach(btn => {
+        btn.addEventListener('click', function() {
+            const sortBy = this.dataset.sort;
+            const currentOrder = this.dataset.order;
+            const newOrder = currentOrder === 'desc' ? 'asc' : 'desc';
+
+            // Update button state
+            this.dataset.order = newOrder;
+            this.classList.add('active');
+            this.querySelector('.sort-arrow').textContent = newOrder === 'desc' ? '↓' : '↑';
+
+            // Reset other buttons
+            sortButtons.forEach(otherBtn => {
+                if (otherBtn !== this) {
+                    otherBtn.classList.remove('active');
+                    otherBtn.dataset.order = 'desc';
+                    otherBtn.querySelector('.sort-arrow').textContent = '↓';
                 }
             });
-            
-            // Initial search to handle any pre-filled search terms
+
+            // Sort departments
+            sortDepartments(sortBy, newOrder);
+        });
+    });
+
+    // Add event listeners; keystrokes are coalesced so the cards are
+    // filtered at most once per frame
+    let searchFrame = 0;
+    searchInput.addEventListener('input', function() {
+        if (searchFrame) cancelAnimationFrame(searchFrame);
+        searchFrame = requestAnimationFrame(function() {
+            searchFrame = 0;
             performSearch();
-            
-            // Default sort by operating budget (descending)
-            const operatingBtn = document.querySelector('.sort-btn[data-sort="operating"]');
-            operatingBtn.dataset.order = 'desc';
-            operatingBtn.querySelector('.sort-arrow').textContent = '↓';
-            operatingBtn.classList.add('active');
-            sortDepartments('operating', 'desc');
         });
-    </script>
-</body>
-</html>
+    });
+    searchInput.addEventListener('keyup', function(e) {
+        if (e.key === 'Escape') {
+            searchInput.value = '';
+            performSearch();
+        }
+    });
+
+    // Focus search on Cmd+K / Ctrl+K
+    document.addEventListener('keydown', function(e) {
+        if ((e.ctrlKey || e.metaKey) && e.key === 'k') {
+            e.preventDefault();
+            searchInput.focus();
+        }
+    });
+
+    // Initial search to handle any pre-filled search terms
+    performSearch();
+
+    // Default sort by operating budget (descending)
+    const operatingBtn = document.querySelector('.sort-btn[data-sort="operating"]');
+    operatingBtn.dataset.order = 'desc';
+    operatingBtn.querySelector('.sort-arrow').textContent = '↓';
+    operatingBtn.classList.add('active');
+    sortDepartments('operating', 'desc');
+});
 """
-        return html
+
+def load_allocations(data_file):
+    """
+    Load the budget allocations CSV, reusing the cached frame when the file
+    is unchanged since it was last parsed.
+    """
+    stat = Path(data_file).stat()
+    # A frame pickled by another pandas version may not load, or load wrong
+    key = (stat.st_mtime_ns, stat.st_size, tuple(CSV_DTYPES.items()), pd.__version__)
+    cache_file = CACHE_DIR / f"{Path(data_file).stem}.pkl"
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, df = pickle.load(f)
+        if cached_key == key:
+            return df
+    except Exception:
+        # Missing, partial or incompatible cache: parse the CSV again
+        pass
+    
+    # pyarrow's multithreaded reader is much faster when available
+    try:
+        df = pd.read_csv(data_file, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv(data_file, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, engine='c')
+    
+    # Write-then-rename so a concurrent or interrupted run never sees a partial file
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump((key, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    
+    return df
+
+
+# Inline SVG chart geometry (viewBox units; the chart scales to its container)
+CHART_WIDTH = 1000
+CHART_HEIGHT = 340
+CHART_LEFT = 30
+CHART_RIGHT = 970
+CHART_BAR_TOP = 130
+CHART_BAR_HEIGHT = 60
+# Rows for the callout labels of segments too narrow to hold their amount
+CHART_CALLOUT_ROWS = (100, 70)
+CHART_FONT = "-apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif"
+
+
+def _chart_amount_label(amount):
+    """Format an amount in millions as $X.XB or $XM for chart labels."""
+    if amount >= 1000:
+        return f'${amount/1000:,.1f}B'
+    return f'${amount:,.0f}M'
+
+
+def _contrast_text_color(color):
+    """Pick white or black text for legibility on a #rrggbb fill."""
+    brightness = sum(int(color[i:i + 2], 16) for i in (1, 3, 5)) / (3 * 255)
+    return 'white' if brightness < 0.6 else 'black'
+
+
+# Label color on each fund's bar segment, worked out once for the fixed palette
+FUND_TEXT_COLORS = MappingProxyType({ft: _contrast_text_color(color) for ft, color in FUND_COLORS.items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _minify_css(css):
+    """Collapse the whitespace in a stylesheet (cached; the stylesheets are constants)."""
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};])\s*', r'\1', css).strip()
+
+
+def _format_scaled(value, suffix):
+    """
+    Format an already-scaled amount as $<value><suffix>, with as few decimal
+    places (up to 2) as represent it exactly.
+    """
+    if value == int(value):
+        digits = 0
+    elif value * 10 == int(value * 10):
+        digits = 1
+    else:
+        digits = 2
+    # %-formatting is cheaper than format specs but has no thousands
+    # separator, which only values that round to 1000 or more need
+    if -999 < value < 999:
+        return '$%.*f%s' % (digits, value, suffix)
+    return '$%s%s' % (format(value, ',.%df' % digits), suffix)
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_budget_millions(amount_millions):
+    """Format an amount in millions as $X.XXB or $X.XXM, with up to 2 decimal places."""
+    if amount_millions >= 1000:
+        return _format_scaled(amount_millions / 1000, 'B')
+    return _format_scaled(amount_millions, 'M')
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_scaled_currency(amount, billion_suffix, million_suffix):
+    """
+    Format an amount in dollars as billions or millions, with up to 2 decimal
+    places (cached; reports repeat a small set of totals, zeros above all).
+    """
+    if amount >= 1_000_000_000:
+        return _format_scaled(amount / 1_000_000_000, billion_suffix)
+    return _format_scaled(amount / 1_000_000, million_suffix)
+
+
+def _tick_step(span, target_ticks=8):
+    """Round span / target_ticks up to a 1, 2, 2.5 or 5 x 10^n tick step."""
+    raw = span / target_ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 2.5, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+
+
+# Chart body for departments with no operating budget
+CHART_NO_DATA = (f'<text x="{CHART_WIDTH / 2}" y="{CHART_HEIGHT / 2}" text-anchor="middle" '
+                 f'font-size="18">No Operating Budget Data</text></svg>')
+
+
+# Fixed-size placeholder for --legacy-charts reports (shown through an <img>,
+# so it needs intrinsic dimensions)
+LEGACY_CHART_PLACEHOLDER = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="200" viewBox="0 0 {width} 200" '
+    'font-family="{font}"><rect width="{width}" height="200" fill="white"/>'
+    '<text x="{middle}" y="50" text-anchor="middle" font-size="26" font-weight="bold" '
+    'fill="#2c3e50">{title}</text>'
+    '<text x="{middle}" y="130" text-anchor="middle" font-size="18">{message}</text></svg>'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _legacy_chart_backend():
+    """
+    Import matplotlib and set the chart fonts, once per process. Only the
+    --legacy-charts renderer needs it, so default runs skip the import.
+    
+    Returns:
+        Tuple of (rcParams, Figure, FigureCanvasAgg)
+    """
+    import matplotlib
+    # Set the backend to 'Agg' to prevent display issues
+    matplotlib.use('Agg')
+    # Charts draw on Figure objects with an Agg canvas directly, bypassing
+    # pyplot's global figure manager
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    # A fixed svg.hashsalt keeps SVG clip-path ids, and so the reports,
+    # identical from run to run
+    matplotlib.rcParams.update({'font.size': 14, 'axes.titlesize': 16, 'axes.labelsize': 14,
+                                'svg.hashsalt': 'budget-report'})
+    return matplotlib.rcParams, Figure, FigureCanvasAgg
+
+
+@functools.lru_cache(maxsize=64)
+def _legacy_chart_placeholder(title, message):
+    """Return a base64-encoded SVG placeholder chart showing just a title and a message."""
+    svg = LEGACY_CHART_PLACEHOLDER.format(
+        width=CHART_WIDTH, middle=CHART_WIDTH / 2, font=html.escape(CHART_FONT),
+        title=html.escape(title), message=html.escape(message))
+    return base64.b64encode(svg.encode('utf-8')).decode('ascii')
+
+
+# Memoized on the full chart signature: an identical chart is only built once
+@functools.lru_cache(maxsize=64)
+def _svg_bar(amounts, colors, labels, title):
+    """
+    Render a horizontal stacked bar chart as inline SVG markup.
+    
+    Args:
+        amounts: Tuple of segment amounts in millions of dollars, in drawing order
+        colors: Tuple of #rrggbb fill colors, one per segment
+        labels: Tuple of legend labels, one per segment
+        title: Chart title
+        
+    Returns:
+        SVG markup string
+    """
+    title = html.escape(title)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {CHART_WIDTH} {CHART_HEIGHT}" '
+        f'width="100%" role="img" aria-label="{title}" font-family="{CHART_FONT}">',
+        f'<rect width="{CHART_WIDTH}" height="{CHART_HEIGHT}" fill="white"/>',
+        f'<text x="{CHART_WIDTH / 2}" y="40" text-anchor="middle" font-size="26" '
+        f'font-weight="bold" fill="#2c3e50">{title}</text>',
+    ]
+    
+    if not amounts:
+        parts.append(CHART_NO_DATA)
+        return ''.join(parts)
+    
+    total = sum(amounts)
+    x_max = total * 1.2
+    scale = (CHART_RIGHT - CHART_LEFT) / x_max
+    lefts = np.cumsum((0,) + tuple(amounts[:-1])) * scale + CHART_LEFT
+    bar_bottom = CHART_BAR_TOP + CHART_BAR_HEIGHT
+    bar_middle = CHART_BAR_TOP + CHART_BAR_HEIGHT / 2
+    
+    # Dashed vertical grid with tick labels along the bottom
+    step = _tick_step(x_max)
+    for tick in np.arange(0, x_max, step):
+        x = CHART_LEFT + tick * scale
+        parts.append(f'<line x1="{x:.1f}" y1="60" x2="{x:.1f}" y2="{bar_bottom + 20}" '
+                     f'stroke="#666666" stroke-opacity="0.3" stroke-dasharray="4 4"/>'
+                     f'<text x="{x:.1f}" y="{bar_bottom + 42}" text-anchor="middle" '
+                     f'font-size="14">{tick:,g}</text>')
+    
+    # Callout leader lines are drawn before any callout box so a line never
+    # crosses over a label on a lower row
+    callout_lines = []
+    callout_boxes = []
+    callout_ends = [float('-inf')] * len(CHART_CALLOUT_ROWS)
+    for amount, left, color, label in zip(amounts, lefts, colors, labels):
+        width = amount * scale
+        center = left + width / 2
+        text = _chart_amount_label(amount)
+        parts.append(f'<rect x="{left:.1f}" y="{CHART_BAR_TOP}" width="{width:.1f}" '
+                     f'height="{CHART_BAR_HEIGHT}" fill="{color}" fill-opacity="0.9"/>')
+        if amount > total * 0.1:
+            parts.append(f'<text x="{center:.1f}" y="{bar_middle}" text-anchor="middle" '
+                         f'dominant-baseline="central" font-size="16" font-weight="bold" '
+                         f'fill="{FUND_TEXT_COLORS[label]}">{text}</text>')
+            continue
+        
+        # Narrow segment: label it in a callout above the bar, on the first
+        # row with room (else the least crowded one)
+        box_width = 10 * len(text) + 16
+        box_left = center - box_width / 2
+        row = next((i for i, end in enumerate(callout_ends) if end < box_left),
+                   callout_ends.index(min(callout_ends)))
+        callout_ends[row] = box_left + box_width
+        y = CHART_CALLOUT_ROWS[row]
+        callout_lines.append(f'<line x1="{center:.1f}" y1="{CHART_BAR_TOP}" x2="{center:.1f}" '
+                             f'y2="{y + 12}" stroke="black" stroke-opacity="0.6" stroke-width="1.5"/>')
+        callout_boxes.append(f'<rect x="{box_left:.1f}" y="{y - 12}" width="{box_width}" height="24" '
+                             f'rx="6" fill="white" stroke="#666666"/><text x="{center:.1f}" y="{y}" '
+                             f'text-anchor="middle" dominant-baseline="central" font-size="14" '
+                             f'font-weight="bold">{text}</text>')
+    parts.extend(callout_lines)
+    parts.extend(callout_boxes)
+    
+    parts.append(f'<text x="{CHART_WIDTH / 2}" y="{bar_bottom + 74}" text-anchor="middle" '
+                 f'font-size="15" font-weight="bold">Amount (Millions of Dollars)</text>')
+    
+    if len(labels) > 1:
+        # Centered legend row: swatch, gap, label text, spacing
+        widths = [24 + 8 + 9 * len(label) + 28 for label in labels]
+        x = (CHART_WIDTH - sum(widths) + 28) / 2
+        y = CHART_HEIGHT - 20
+        for label, color, width in zip(labels, colors, widths):
+            parts.append(f'<rect x="{x:.1f}" y="{y - 6}" width="24" height="12" fill="{color}" '
+                         f'fill-opacity="0.9"/><text x="{x + 32:.1f}" y="{y}" dominant-baseline="central" '
+                         f'font-size="14" font-weight="bold" fill="#2c3e50">{html.escape(label)}</text>')
+            x += width
+    
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+class DepartmentalBudgetAnalyzer:
+    """Generate departmental budget reports with HTML tables and charts."""
+    
+    # Read-only lookup tables shared by every instance
+    fund_mappings = FUND_MAPPINGS
+    colors = FUND_COLORS
+    department_names = DEPARTMENT_NAMES
+    display_names = DISPLAY_NAMES
+    
+    def __init__(self, data_file: str, output_dir: str = "data/output/departmental_reports",
+                 descriptions_file: str = "data/processed/department_descriptions.json",
+                 legacy_charts: bool = False, precompress: bool = False):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            data_file: Path to the budget allocations CSV file
+            output_dir: Directory to save HTML reports
+            descriptions_file: Path to the JSON file containing department descriptions
+            legacy_charts: Render charts with matplotlib instead of inline SVG
+            precompress: Also write a gzip-precompressed .gz copy of every output file
+        """
+        self.data_file = data_file
+        self.legacy_charts = legacy_charts
+        self.precompress = precompress
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Load data
+        self.df = load_allocations(data_file)
+        logger.info("Loaded %s budget allocations", len(self.df))
+        
+        # Chart figure, created on first use and reused across departments
+        self._chart_fig = None
+        self._chart_ax = None
+        
+        # Load department descriptions
+        self.descriptions = self._load_descriptions(descriptions_file)
+        
+        # Map fund types once for the whole dataset via a lookup table over
+        # fund_type's categorical codes. Unmapped fund types become NaN (code
+        # -1, which indexes the trailing -1) since they still count toward
+        # section totals.
+        fund_types = self.df['fund_type']
+        lut = np.array(
+            [FUND_CATEGORIES.index(FUND_MAPPINGS[ft]) if ft in FUND_MAPPINGS else -1
+             for ft in fund_types.cat.categories] + [-1],
+            dtype=np.int8,
+        )
+        self.df['fund_category_mapped'] = pd.Categorical.from_codes(
+            lut[fund_types.cat.codes.to_numpy()], categories=FUND_CATEGORIES
+        )
+        
+        # Sum every (department, section, fund category) total in one
+        # bincount over the combined categorical codes, into a dense
+        # departments x sections x funds array. Missing values (code -1) get
+        # a trailing slot on each axis, so they still count toward totals.
+        codes = []
+        labels = []
+        for column in ('department_code', 'section', 'fund_category_mapped'):
+            categories = self.df[column].cat.categories
+            column_codes = self.df[column].cat.codes.to_numpy().astype(np.intp)
+            column_codes[column_codes < 0] = len(categories)
+            codes.append(column_codes)
+            labels.append(list(categories) + [np.nan])
+        shape = tuple(map(len, labels))
+        flat = np.ravel_multi_index(codes, shape)
+        size = math.prod(shape)
+        # Missing amounts count as zero, as they do in a pandas sum
+        amounts = self.df['amount'].fillna(0).to_numpy(dtype=np.float64)
+        totals = np.bincount(flat, weights=amounts, minlength=size).reshape(shape)
+        present = np.bincount(flat, minlength=size).reshape(shape) > 0
+        
+        # Only departments and sections that occur in the data get a slot
+        dept_present = present.any(axis=(1, 2))
+        section_present = present.any(axis=(0, 2))
+        dept_labels = [label for label, keep in zip(labels[0], dept_present) if keep]
+        section_labels = [label for label, keep in zip(labels[1], section_present) if keep]
+        
+        # Section totals (all fund types) with one row per department
+        self._section_totals = pd.DataFrame(
+            totals.sum(axis=2)[np.ix_(dept_present, section_present)],
+            index=pd.Index(dept_labels, name='department_code'),
+            columns=pd.Index(section_labels, name='section'),
+        )
+        
+        # Fund category breakdown per (department, section), looked up by slot
+        self._fund_totals = totals[np.ix_(dept_present, section_present)][:, :, :len(FUND_CATEGORIES)]
+        self._dept_slots = {label: i for i, label in enumerate(dept_labels)}
+        self._section_slots = {label: i for i, label in enumerate(section_labels)}
+    
+    def get_department_summary(self, dept_code: str) -> dict:
+        """
+        Get comprehensive budget summary for a department.
+        
+        Args:
+            dept_code: Department code (e.g., 'AGR')
+            
+        Returns:
+            Dictionary with department budget breakdown
+        """
+        if dept_code not in self._section_totals.index:
+            logger.warning("No data found for department %s", dept_code)
+            return None
+        
+        # Use full department name from mapping
+        dept_name = DEPARTMENT_NAMES.get(dept_code, dept_code)
+        
+        # Section totals and per-fund breakdowns are row lookups into the
+        # tables precomputed in __init__
+        section_totals = self._section_totals.loc[dept_code]
+        
+        dept_slot = self._dept_slots[dept_code]
+        
+        def by_fund(section):
+            section_slot = self._section_slots.get(section)
+            if section_slot is None:
+                return pd.Series(0.0, index=FUND_CATEGORIES)
+            return pd.Series(self._fund_totals[dept_slot, section_slot], index=FUND_CATEGORIES)
+        
+        # Calculate operating budget by fund type
+        operating_by_fund = by_fund('Operating')
+        
+        # Calculate CIP projects (Capital Improvement section)
+        cip_total = section_totals.get('Capital Improvement', 0)
+        
+        # Calculate other appropriations (non-operating, non-CIP)
+        other_total = section_totals.drop(['Operating', 'Capital Improvement'], errors='ignore').sum()
+        
+        # Total operating budget (excluding one-time appropriations)
+        total_operating = operating_by_fund.sum()
+        
+        # Handle one-time appropriations separately
+        one_time_by_fund = by_fund('One-Time')
+        one_time_total = one_time_by_fund.sum()
+        
+        # Overall total includes operating + one-time + other appropriations
+        total_budget = total_operating + one_time_total + other_total
+        
+        summary = {
+            'department_code': dept_code,
+            'department_name': dept_name,
+            'total_budget': total_budget,
+            'operating_budget': {**operating_by_fund.to_dict(), 'total': total_operating},
+            'one_time_appropriations': {**one_time_by_fund.to_dict(), 'total': one_time_total},
+            'other_appropriations': other_total,
+            'cip_projects': cip_total
+        }
+        
+        return summary
+    
+    def _chart_axes(self):
+        """
+        Return the figure and axes used for department charts.
+        
+        The figure is created on first use and cleared for each later chart,
+        so a run builds a single figure instead of one per department.
+        """
+        rc_params, Figure, FigureCanvasAgg = _legacy_chart_backend()
+        if self._chart_fig is None:
+            self._chart_fig = Figure(figsize=(16, 8), dpi=150)
+            FigureCanvasAgg(self._chart_fig)
+            self._chart_ax = self._chart_fig.subplots()
+        else:
+            self._chart_ax.cla()
+            # tight_layout moved the axes for the previous chart; start over
+            # from the default margins so each chart lays out identically
+            self._chart_fig.subplots_adjust(
+                **{side: rc_params[f'figure.subplot.{side}']
+                   for side in ('left', 'right', 'bottom', 'top')})
+        return self._chart_fig, self._chart_ax
+    
+    def close(self):
+        """Release the cached chart figure."""
+        self._chart_fig = self._chart_ax = None
+    
+    def __getstate__(self):
+        # Report workers render from the summaries they are handed, so leave
+        # the allocations frame and its aggregates behind; the chart figure
+        # is per process
+        state = self.__dict__.copy()
+        for attr in ('df', '_section_totals', '_fund_totals', '_chart_fig', '_chart_ax'):
+            state[attr] = None
+        return state
+    
+    def create_department_svg(self, summary: dict) -> str:
+        """
+        Create the operating budget chart as an inline SVG stacked bar.
+        
+        Args:
+            summary: Department summary dictionary
+            
+        Returns:
+            SVG markup string
+        """
+        segments = sorted(
+            ((summary['operating_budget'][ft] / 1_000_000, FUND_COLORS[ft], ft) for ft in FUND_CATEGORIES),
+            key=lambda x: x[0], reverse=True)
+        segments = [seg for seg in segments if seg[0] > 0]
+        amounts, colors, labels = zip(*segments) if segments else ((), (), ())
+        return _svg_bar(amounts, colors, labels, f'{summary["department_code"]} Operating Budget (FY26)')
+    
+    def create_department_chart(self, summary: dict) -> str:
+        """
+        Create a horizontal stacked bar chart for department budget with non-overlapping labels.
+        
+        Args:
+            summary: Department summary dictionary
+            
+        Returns:
+            Base64 encoded SVG image string
+        """
+        title = f'{summary["department_code"]} Operating Budget (FY26)'
+        try:
+            fund_types = ['General Funds', 'Special Funds', 'Federal Funds', 'Other Funds']
+            amounts = [summary['operating_budget'][ft] / 1_000_000 for ft in fund_types]
+            colors = [FUND_COLORS[ft] for ft in fund_types]
+            
+            filtered_data = sorted([(amt, color, label) for amt, color, label in 
+                                  zip(amounts, colors, fund_types) if amt > 0],
+                                 key=lambda x: x[0], reverse=True)
+            
+            # Nothing to plot, so skip matplotlib entirely
+            if not filtered_data:
+                return _legacy_chart_placeholder(title, 'No Operating Budget Data')
+            
+            fig, ax = self._chart_axes()
+            
+            amounts, colors, fund_types = zip(*filtered_data)
+            total_amount = sum(amounts)
+            left = 0
+            
+            # Draw the whole stacked bar in one call; each segment starts
+            # where the previous one ends
+            lefts = np.concatenate(([0.0], np.cumsum(amounts)[:-1]))
+            bars = ax.barh(np.zeros(len(amounts)), amounts, left=lefts, color=colors,
+                           height=0.6, alpha=0.9)
+            bars_list = list(bars)
+            segment_starts = []
+            label_positions = []
+            
+            for i, (amount, color, label) in enumerate(zip(amounts, colors, fund_types)):
+                segment_center = left + amount/2
+                # Format as billions if ≥ 1000 million, otherwise as millions
+                if amount >= 1000:
+                    text = f'${amount/1000:,.1f}B'
+                else:
+                    text = f'${amount:,.0f}M'
+                
+                segment_starts.append(left)
+                if amount > total_amount * 0.1:  
+                    ax.text(segment_center, 0, text, 
+                                 ha='center', va='center',
+                                 color=FUND_TEXT_COLORS[label],
+                                 fontweight='bold', 
+                                 fontsize=14,
+                                 bbox=dict(facecolor='none', 
+                                           edgecolor='none',
+                                           alpha=0.7,
+                                           boxstyle='round,pad=0.2'))
+                    label_positions.append((left, left + amount))
+                else:
+                    label_positions.append(None)
+                
+                left += amount
+            
+            # Segments tile the bar left to right, so the labelled
+            # intervals are sorted and only the nearest labelled segment on
+            # each side of a short segment can overlap it. A short segment
+            # clear of both gets a callout above the bar; one touching a
+            # label is labelled on the bar
+            labeled = [i for i, pos in enumerate(label_positions) if pos is not None]
+            for i, amount in enumerate(amounts):
+                if label_positions[i] is None:
+                    segment_start = segment_starts[i]
+                    segment_end = segment_start + amount
+                    
+                    k = bisect.bisect_left(labeled, i)
+                    overlap = ((k > 0 and label_positions[labeled[k - 1]][1] >= segment_start) or
+                               (k < len(labeled) and label_positions[labeled[k]][0] <= segment_end))
+                    y_offset = 0 if overlap else 0.7
+                    
+                    # Format as billions if ≥ 1000 million, otherwise as millions
+                    if amount >= 1000:
+                        amount_text = f'${amount/1000:,.1f}B'
+                    else:
+                        amount_text = f'${amount:,.0f}M'
+                    
+                    ax.text(segment_start + amount/2, y_offset, amount_text,
+                                 ha='center', va='center',
+                                 bbox=dict(facecolor='white', 
+                                           alpha=0.9, 
+                                           edgecolor='#666666',
+                                           boxstyle='round,pad=0.6'),
+                                 fontsize=12,
+                                 fontweight='bold')
+                    
+                    if y_offset != 0:
+                        ax.plot([segment_start + amount/2, segment_start + amount/2], 
+                                [0 if y_offset > 0 else -0.3, y_offset * 0.9], 
+                                'k-', lw=1.5, alpha=0.6)
+            
+            ax.set_xlim(0, total_amount * 1.2)  
+            ax.set_ylim(-3, 3)  
+            
+            ax.xaxis.grid(True, linestyle='--', alpha=0.3, color='#666666')
+            ax.set_xlabel('Amount (Millions of Dollars)', 
+                        fontsize=14, 
+                        labelpad=15,
+                        fontweight='bold')
+            ax.set_yticks([])  
+            
+            for spine in ax.spines.values():
+                spine.set_visible(False)
+            
+            if len(fund_types) > 1:
+                # Create legend with proper formatting
+                legend = ax.legend(
+                    handles=bars_list,
+                    labels=fund_types,  # Explicitly set labels from fund_types
+                    bbox_to_anchor=(0.5, -0.15), 
+                    loc='upper center',
+                    ncol=min(4, len(fund_types)),  # Limit columns for better layout
+                    frameon=False,
+                    fontsize=12,
+                    handletextpad=0.8,
+                    columnspacing=1.5,
+                    borderpad=1.0
+                )
+                
+                # Make legend text bold and set proper color
+                for text in legend.get_texts():
+                    text.set_fontweight('bold')
+                    text.set_color('#2c3e50')  # Dark gray for better readability
+
+            fig.tight_layout(pad=3.0)
+            
+            # Set title with improved styling
+            ax.set_title(
+                title,
+                fontsize=24,
+                pad=20,
+                fontweight='bold',
+                color='#2c3e50'
+            )
+            
+            # Save as SVG: a few bars and labels are far cheaper to emit as
+            # vectors than to rasterize and PNG-compress, and stay sharp when
+            # scaled (no date stamp, so unchanged charts stay byte-identical)
+            buf = io.BytesIO()
+            fig.savefig(buf, format='svg', bbox_inches='tight', facecolor='white',
+                        metadata={'Date': None})
+            
+            # Encode to base64
+            data = base64.b64encode(buf.getbuffer()).decode('ascii')
+            return data
+            
+        except Exception as e:
+            logger.error("Error creating chart for %s: %s", summary.get('department_code', 'unknown'), e)
+            logger.error("Traceback: %s", traceback.format_exc())
+            
+            # Fall back to a plain placeholder; it doesn't go through
+            # matplotlib, which may be what failed
+            return _legacy_chart_placeholder(title, f'Chart Error: {str(e)[:50]}...')
+    
+    def _load_descriptions(self, descriptions_file: str) -> dict:
+        """
+        Load department descriptions from a JSON file.
+        
+        Args:
+            descriptions_file: Path to the JSON file containing department descriptions
+            
+        Returns:
+            Dictionary mapping department codes to their descriptions
+        """
+        try:
+            with open(descriptions_file, 'r', encoding='utf-8') as f:
+                descriptions = json.load(f)
+            logger.info("Loaded descriptions for %s departments", len(descriptions))
+            return descriptions
+        except FileNotFoundError:
+            logger.warning("Department descriptions file not found: %s", descriptions_file)
+            return {}
+        except json.JSONDecodeError as e:
+            logger.error("Error parsing department descriptions: %s", e)
+            return {}
+    
+    def get_department_description(self, dept_code: str) -> str:
+        """
+        Get the description for a department.
+        
+        Args:
+            dept_code: Department code (e.g., 'AGR')
+            
+        Returns:
+            Department description as a string
+        """
+        # Get the display name for the department
+        display_name = DISPLAY_NAMES.get(dept_code, dept_code)
+        
+        # Try to get the description for the department
+        dept_info = self.descriptions.get(dept_code, {})
+        
+        # If we have a description, use it
+        if 'description' in dept_info:
+            return dept_info['description']
+            
+        # Otherwise, use the display name with a default message
+        return f"{display_name} is a department of the State of Hawaii. {DEFAULT_DEPT_DESCRIPTION}"
+    
+    def _get_css_styles(self) -> str:
+        """Return the CSS styles for the HTML report, minified."""
+        return _minify_css(REPORT_CSS)
+    
+    def _format_currency(self, amount: float) -> str:
+        """Format currency amounts for display with up to 2 decimal places."""
+        return _format_scaled_currency(amount, 'B', 'M')
+    
+    def _format_currency_long(self, amount: float) -> str:
+        """Format currency amounts for display with long form and up to 2 decimal places."""
+        return _format_scaled_currency(amount, ' Billion', ' Million')
+    
+    def _build_summary_cards(self, summary: dict) -> str:
+        """Build the summary cards section."""
+        operating_total = summary['operating_budget']['total']
+        one_time_total = summary['one_time_appropriations']['total']
+        cip_total = summary['cip_projects']
+        
+        # Always show operating and CIP, conditionally show one-time
+        parts = ['\n    <div class="summary-stats">\n        ',
+                 SUMMARY_CARD.format(amount=self._format_currency(operating_total), label='Operating Budget')]
+        
+        # Add one-time appropriations card if there are any
+        if one_time_total > 0:
+            parts.append(SUMMARY_CARD.format(amount=self._format_currency(one_time_total),
+                                             label='One-Time Appropriations'))
+        
+        parts.append(SUMMARY_CARD.format(amount=self._format_currency(cip_total),
+                                         label='Capital Improvement Projects'))
+        parts.append('\n    </div>')
+        return ''.join(parts)
+    
+    def _build_budget_table(self, summary: dict) -> str:
+        """Build the budget breakdown table."""
+        op_budget = summary['operating_budget']
+        one_time_budget = summary['one_time_appropriations']
+        
+        # Build operating budget section
+        parts = [BUDGET_TABLE_OPERATING.format_map({
+            'dept_code': summary['department_code'],
+            'total': self._format_currency_long(op_budget['total']),
+            **self._fund_amounts(op_budget),
+        })]
+        
+        # Add one-time appropriations section if there are any
+        if one_time_budget['total'] > 0:
+            parts.append(BUDGET_TABLE_ONE_TIME.format_map({
+                'total': self._format_currency_long(one_time_budget['total']),
+                **self._fund_amounts(one_time_budget),
+            }))
+        
+        # Add CIP section
+        parts.append(BUDGET_TABLE_CIP.format(total=self._format_currency_long(summary['cip_projects'])))
+        
+        return ''.join(parts)
+    
+    def _fund_amounts(self, budget: dict) -> dict:
+        """Format a fund breakdown as template values keyed general/special/federal/other."""
+        return {
+            'general': self._format_currency(budget['General Funds']),
+            'special': self._format_currency(budget['Special Funds']),
+            'federal': self._format_currency(budget['Federal Funds']),
+            'other': self._format_currency(budget['Other Funds']),
+        }
+    
+    def _build_chart_section(self, summary: dict) -> str:
+        """Build the chart section."""
+        dept_code = summary['department_code']
+        
+        if self.legacy_charts:
+            chart_base64 = self.create_department_chart(summary)
+            chart = f'<img src="data:image/svg+xml;base64,{chart_base64}" alt="{dept_code} Budget Chart">'
+        else:
+            chart = self.create_department_svg(summary)
+        
+        return f"""
+    <div class="chart-container">
+        <h3>Figure 15. {dept_code} Operating Budget</h3>
+        <div class="chart-wrapper">
+            {chart}
+        </div>
+    </div>"""
+    
+    def generate_html_report(self, summary: dict) -> str:
+        """
+        Generate HTML report for a department using template-based approach.
+        
+        Args:
+            summary: Department summary dictionary
+            
+        Returns:
+            HTML string
+        """
+        buffer = io.StringIO()
+        self.write_html_report(summary, buffer)
+        return buffer.getvalue()
+    
+    def write_html_report(self, summary: dict, fh) -> None:
+        """
+        Write the HTML report for a department section by section.
+        
+        Args:
+            summary: Department summary dictionary
+            fh: Text file object to write the report to
+        """
+        # Get department info
+        dept_code = summary['department_code']
+        dept_name = summary['department_name']
+        dept_description = self.get_department_description(dept_code)
+        
+        # Write each section as soon as it is built instead of assembling
+        # the whole page in memory first
+        fh.write(REPORT_HEADER.format_map({
+            'dept_code': dept_code,
+            'dept_name': dept_name,
+            'dept_description': dept_description,
+            'stylesheet': REPORT_STYLESHEET,
+        }))
+        fh.write(self._build_summary_cards(summary))
+        fh.write(REPORT_SECTION_BREAK)
+        fh.write(self._build_budget_table(summary))
+        fh.write(REPORT_SECTION_BREAK)
+        fh.write(self._build_chart_section(summary))
+        fh.write(REPORT_FOOTER)
+    
+    def generate_all_reports(self):
+        """Generate HTML reports for all departments."""
+        # Get all unique department codes
+        dept_codes = sorted(self.df['department_code'].unique())
+        
+        logger.info("Generating reports for %s departments", len(dept_codes))
+        
+        # Create index page, streamed to disk card by card
+        index_path = self.output_dir / "index.html"
+        with open(index_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as fh:
+            self.write_index_page(dept_codes, fh)
+        _update_gzip_copy(index_path, self.precompress)
+        logger.info("Created index page: %s", index_path)
+        
+        # The stylesheets and index script are static, so write them once and
+        # let browsers cache them across pages
+        static_assets = {
+            INDEX_STYLESHEET: _minify_css(INDEX_CSS),
+            INDEX_SCRIPT: INDEX_JS,
+            REPORT_STYLESHEET: self._get_css_styles(),
+        }
+        for name, text in static_assets.items():
+            _write_report(self.output_dir / name, text.encode('utf-8'), self.precompress)
+        
+        # Summaries come from the precomputed aggregate and are cheap, so
+        # build them here and fan the chart rendering and HTML assembly out
+        # to worker processes
+        summaries = []
+        for dept_code in dept_codes:
+            logger.info("Processing department: %s", dept_code)
+            summary = self.get_department_summary(dept_code)
+            if summary is None:
+                logger.warning("Skipped %s - no data available", dept_code)
+            elif summary['total_budget'] == 0 and summary['cip_projects'] == 0:
+                # Nothing to chart or tabulate (total_budget excludes CIP,
+                # which is all the counties have), so don't render an empty report
+                logger.info("Skipped %s - total budget is zero", dept_code)
+            else:
+                summaries.append(summary)
+        
+        workers = min(os.cpu_count() or 1, max(len(summaries), 1))
+        writes = {}
+        with ProcessPoolExecutor(workers, initializer=_init_report_worker,
+                                 initargs=(self,)) as executor, \
+                ThreadPoolExecutor(max_workers=4) as writer:
+            # Hand each rendered report to a writer thread so the file I/O
+            # overlaps with the rendering still in progress
+            for result in executor.map(_render_report, summaries):
+                if result is not None:
+                    dept_code, filepath, data = result
+                    writes[writer.submit(_write_report, filepath, data, self.precompress)] = (dept_code, filepath)
+        
+        for future, (dept_code, filepath) in writes.items():
+            try:
+                future.result()
+                logger.info("Successfully generated report for %s: %s", dept_code, filepath)
+            except OSError as e:
+                logger.error("Error writing report for %s: %s", dept_code, e)
+    
+    def create_index_page(self, dept_codes: list) -> str:
+        """Create an index page linking to all department reports."""
+        buffer = io.StringIO()
+        self.write_index_page(dept_codes, buffer)
+        return buffer.getvalue()
+    
+    def write_index_page(self, dept_codes: list, fh) -> None:
+        """
+        Write the index page linking to all department reports.
+        
+        Args:
+            dept_codes: Department codes to list
+            fh: Text file object to write the page to
+        """
+        # Department totals and operating vs capital vs one-time breakdown,
+        # from the per-department section totals precomputed in __init__
+        section_totals = self._section_totals.reindex(
+            columns=['Operating', 'Capital Improvement', 'One-Time'], fill_value=0
+        ) / 1_000_000
+        # Plain dicts, so the per-department lookups below skip pandas indexing
+        dept_totals = (self._section_totals.sum(axis=1) / 1_000_000).to_dict()
+        dept_sections = dict(zip(section_totals.index, section_totals.itertuples(index=False, name=None)))
+        
+        # Get department names and budget breakdown
+        dept_info = []
+        name_get = DEPARTMENT_NAMES.get
+        for code in dept_codes:
+            # Departments with a zero total get no report, so no card either
+            if dept_totals.get(code, 0) != 0:
+                # Use full department name from mapping
+                name = name_get(code, code)
+                operating, capital, one_time = dept_sections[code]
+                # The lowercased code names the report file and feeds the
+                # card's search text, so compute it once here
+                dept_info.append((code, name, dept_totals[code], operating, capital, one_time, code.lower()))
+        
+        # Sort by operating budget (descending), then by total budget (descending)
+        dept_info.sort(key=lambda x: (-x[3], -x[2]))  # x[3] is operating budget, x[2] is total budget
+        
+        # Calculate totals for summary cards
+        total_budget = sum(info[2] for info in dept_info)
+        total_departments = len(dept_info)
+        largest_dept = dept_info[0] if dept_info else ('', '', 0)
+        
+        # Calculate operating vs capital vs one-time budget totals
+        operating_total, capital_total, one_time_total = section_totals.sum()
+        
+        format_budget = _format_budget_millions
+        
+        def render_card(code, name, total, operating, capital, one_time, code_lc):
+            # Always show operating and capital, conditionally show one-time
+            breakdown_items = [INDEX_BREAKDOWN_ITEM.format(label='Operating', value=format_budget(operating))]
+            if one_time > 0:
+                breakdown_items.append(INDEX_BREAKDOWN_ITEM.format(label='One-Time', value=format_budget(one_time)))
+            breakdown_items.append(INDEX_BREAKDOWN_ITEM.format(label='Capital', value=format_budget(capital)))
+            
+            return INDEX_CARD_TEMPLATE.format(
+                code=code, code_lc=code_lc, name=name, total=format_budget(total),
+                operating=operating, capital=capital, one_time=one_time,
+                # Lowercased search text, so the page's search needn't read the
+                # card's text on every keystroke; the newline keeps a query from
+                # matching across the name and code
+                search=html.escape(f'{name.lower()}\n{code_lc}').replace('\n', '&#10;'),
+                breakdown_items=''.join(breakdown_items),
+            )
+        
+        fh.write(INDEX_PAGE_HEADER.substitute(
+            stylesheet=INDEX_STYLESHEET,
+            script=INDEX_SCRIPT,
+            total_budget=format_budget(total_budget),
+            total_departments=total_departments,
+            largest_budget=format_budget(largest_dept[2]),
+            largest_name=largest_dept[1],
+            operating_total=format_budget(operating_total),
+            one_time_total=format_budget(one_time_total),
+            capital_total=format_budget(capital_total),
+        ))
+        for info in dept_info:
+            fh.write(render_card(*info))
+        fh.write(INDEX_PAGE_FOOTER)
+
+
+# Analyzer shared with report worker processes, set by _init_report_worker
+_worker_analyzer = None
+
+
+def _init_report_worker(analyzer):
+    """Store the analyzer once per worker process rather than once per task."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _update_gzip_copy(filepath, precompress, data=None):
+    """
+    Write a gzip-precompressed ``<name>.gz`` copy of a file for static
+    hosting, or remove a stale one when precompression is off.
+    
+    Args:
+        filepath: Path of the file just written
+        precompress: Whether to keep a compressed copy
+        data: The file's bytes, if already in memory
+    """
+    gz_path = filepath.with_name(filepath.name + '.gz')
+    if not precompress:
+        gz_path.unlink(missing_ok=True)
+        return
+    if data is None:
+        data = filepath.read_bytes()
+    # mtime=0 keeps the compressed bytes identical between runs
+    gz_path.write_bytes(gzip.compress(data, compresslevel=6, mtime=0))
+
+
+def _write_report(filepath, data, precompress=False):
+    """Write an output file, plus a gzip-precompressed copy when asked for."""
+    filepath.write_bytes(data)
+    _update_gzip_copy(filepath, precompress, data)
+
+
+def _render_report(summary):
+    """
+    Render one department's HTML report in a worker process.
+    
+    Returns:
+        (dept_code, output path, UTF-8 encoded HTML), or None on error
+    """
+    dept_code = summary['department_code']
+    try:
+        logger.info("Got summary for %s, generating HTML report...", dept_code)
+        filename = f"{dept_code.lower()}_budget_report.html"
+        filepath = _worker_analyzer.output_dir / filename
+        
+        return dept_code, filepath, _worker_analyzer.generate_html_report(summary).encode('utf-8')
+    except Exception as e:
+        logger.error("Error generating report for %s: %s", dept_code, e)
+        logger.error("Full traceback: %s", traceback.format_exc())
+        # Continue with the other departments instead of stopping
+        return None
 
 
 def main():
@@ -1699,14 +2176,21 @@ def main():
     parser.add_argument('--output-dir', '-o', 
                        default='data/output/departmental_reports',
                        help='Output directory for HTML reports')
+    parser.add_argument('--legacy-charts', action='store_true',
+                       help='Render charts with matplotlib instead of inline SVG')
+    parser.add_argument('--precompress', action='store_true',
+                       help='Also write gzip-compressed .gz copies of every output file')
     
     args = parser.parse_args()
     
     # Create analyzer and generate reports
-    analyzer = DepartmentalBudgetAnalyzer(args.data_file, args.output_dir)
+    analyzer = DepartmentalBudgetAnalyzer(args.data_file, args.output_dir,
+                                          legacy_charts=args.legacy_charts,
+                                          precompress=args.precompress)
     analyzer.generate_all_reports()
+    analyzer.close()
     
-    logger.info(f"All reports generated successfully in {args.output_dir}")
+    logger.info("All reports generated successfully in %s", args.output_dir)
     logger.info("Open index.html to view all department reports")
 
 
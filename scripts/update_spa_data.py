@@ -129,6 +129,11 @@ def update_spa_files():
         for style in style_tags:
             extracted_css += style.get_text() + "\n\n"
         
+        # Reports now link a shared stylesheet instead of inlining it
+        shared_css = reports_dir / "styles.css"
+        if shared_css.exists():
+            extracted_css += shared_css.read_text(encoding='utf-8') + "\n\n"
+        
         # Update SPA CSS with departmental report styles
         spa_css_path = gh_pages_dir / "css" / "styles.css"
         